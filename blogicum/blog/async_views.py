@@ -0,0 +1,117 @@
+"""Асинхронные версии страниц только для чтения: лента, категория,
+профиль и пост. Подключаются вместо синхронных при BLOG_ASYNC_VIEWS.
+
+Объекты по ключу выбираются асинхронным ORM, если он есть (Django 4.1+).
+Пагинатор и шаблоны синхронные в любой версии, поэтому выборка страницы
+и рендеринг выполняются через sync_to_async — по одному переходу на шаг.
+"""
+from asgiref.sync import sync_to_async
+from django.db.models.query import QuerySet
+from django.http import Http404
+from django.shortcuts import get_object_or_404, render
+
+from blog.cache import cache_anonymous_feed
+from blog.conditional import (category_state, conditional_page, index_state,
+                              post_state)
+from blog.constants import PAGINATE_BY
+from blog.forms import CommentsForm
+from blog.models import User
+from blog.scheduler import publish_due_posts_if_needed
+from blog.service import (filter_post_list, get_comments_page, get_post_list,
+                          get_published_category, order_post_list, paginator)
+
+HAS_ASYNC_ORM = hasattr(QuerySet, 'aget')
+
+
+async def aget_object_or_404(queryset, **kwargs):
+    if not HAS_ASYNC_ORM:
+        return await sync_to_async(get_object_or_404)(queryset, **kwargs)
+    try:
+        return await queryset.aget(**kwargs)
+    except queryset.model.DoesNotExist:
+        raise Http404
+
+
+def _prepare(request):
+    # Пользователь из сессии и отложенные публикации требуют синхронного
+    # ORM; после загрузки request.user безопасен в event loop.
+    publish_due_posts_if_needed()
+    return request.user.is_authenticated
+
+
+def _load_page(build_post_list, request):
+    page = paginator(build_post_list(), PAGINATE_BY, request)
+    page.object_list = list(page.object_list)
+    return page
+
+
+async def _render_feed(request, template_name, build_post_list, **context):
+    context['page_obj'] = await sync_to_async(_load_page)(
+        build_post_list, request
+    )
+    return await sync_to_async(render)(request, template_name, context)
+
+
+@conditional_page(index_state)
+@cache_anonymous_feed(lambda kwargs: 'index')
+async def index(request):
+    await sync_to_async(_prepare)(request)
+    return await _render_feed(
+        request,
+        'blog/index.html',
+        lambda: order_post_list(filter_post_list(get_post_list()))
+    )
+
+
+@conditional_page(category_state)
+@cache_anonymous_feed(lambda kwargs: f"category:{kwargs['category_slug']}")
+async def category_posts(request, category_slug):
+    await sync_to_async(_prepare)(request)
+    category = await sync_to_async(get_published_category)(category_slug)
+    return await _render_feed(
+        request,
+        'blog/category.html',
+        lambda: filter_post_list(get_post_list()).filter(
+            category_id=category.pk
+        ).order_by('-pub_date'),
+        category=category
+    )
+
+
+@cache_anonymous_feed(lambda kwargs: f"profile:{kwargs['username']}")
+async def profile(request, username):
+    await sync_to_async(_prepare)(request)
+    user = await aget_object_or_404(User.objects.all(), username=username)
+
+    def build_post_list():
+        post_list = order_post_list(get_post_list().filter(author=user))
+        if request.user != user:
+            post_list = filter_post_list(post_list)
+        return post_list
+
+    return await _render_feed(
+        request, 'blog/profile.html', build_post_list, profile=user
+    )
+
+
+@conditional_page(post_state)
+async def post_detail(request, pk):
+    await sync_to_async(_prepare)(request)
+    # Пост уже загружен для валидаторов (post_state).
+    post = getattr(request, 'loaded_post', None)
+    if post is None:
+        post = await aget_object_or_404(get_post_list(), pk=pk)
+    if post.author_id != request.user.id and not post.is_visible:
+        raise Http404
+
+    comments = await sync_to_async(get_comments_page)(post)
+    return await sync_to_async(render)(
+        request,
+        'blog/detail.html',
+        {
+            'object': post,
+            'post': post,
+            'form': CommentsForm(),
+            'comments': comments,
+        }
+    )
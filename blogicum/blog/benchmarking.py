@@ -0,0 +1,143 @@
+"""Общие части команд замеров, нагрузочных тестов и генерации данных.
+
+Запросы идут прямо в WSGI/ASGI-приложение, без сервера и тестового
+клиента: так в замер попадает вся цепочка middleware.
+"""
+from importlib import import_module, reload
+from io import BytesIO
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.middleware.csrf import CSRF_ALLOWED_CHARS
+from django.test import Client
+from django.urls import URLResolver, clear_url_caches
+from django.utils.crypto import get_random_string
+
+from blog.models import Category, Comments, Post
+
+URL_MODULES = ('blog.urls', 'pages.urls')
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def iter_url_names(patterns, namespace, params=()):
+    for pattern in patterns:
+        pattern_params = (*params, *pattern.pattern.regex.groupindex)
+        if isinstance(pattern, URLResolver):
+            yield from iter_url_names(
+                pattern.url_patterns, namespace, pattern_params
+            )
+        elif pattern.name:
+            yield f'{namespace}:{pattern.name}', pattern_params
+
+
+def iter_page_names():
+    """(имя маршрута, параметры) всех страниц URL_MODULES."""
+    for module in URL_MODULES:
+        urls = import_module(module)
+        yield from iter_url_names(urls.urlpatterns, urls.app_name)
+
+
+def get_sample_kwargs():
+    post = Post.objects.filter(
+        is_visible=True
+    ).order_by('-comment_count').select_related('author', 'category').first()
+    if post is None:
+        raise CommandError(
+            'В базе нет опубликованных постов: '
+            'сначала выполните generate_data.'
+        )
+    comment = Comments.objects.filter(post=post).first()
+    category = post.category or Category.objects.filter(
+        is_published=True
+    ).first()
+    return post.author, {
+        'pk': post.pk,
+        'post_id': post.pk,
+        'comment_id': comment.pk if comment else 0,
+        'category_slug': category.slug,
+        'username': post.author.username,
+    }
+
+
+def session_headers(user):
+    """Заголовки environ с сессией user и CSRF-токеном для POST через WSGI."""
+    client = Client()
+    client.force_login(user)
+    csrf_token = get_random_string(64, CSRF_ALLOWED_CHARS)
+    return {
+        'HTTP_COOKIE': '{}={}; {}={}'.format(
+            settings.SESSION_COOKIE_NAME,
+            client.cookies[settings.SESSION_COOKIE_NAME].value,
+            settings.CSRF_COOKIE_NAME,
+            csrf_token,
+        ),
+        'HTTP_X_CSRFTOKEN': csrf_token,
+    }
+
+
+def reload_urlconf():
+    """Пересобрать маршруты после смены BLOG_ASYNC_VIEWS."""
+    reload(import_module('blog.urls'))
+    reload(import_module(settings.ROOT_URLCONF))
+    clear_url_caches()
+
+
+def wsgi_request(application, path, method='GET', body=b'', **headers):
+    """Статус ответа WSGI-приложения; headers — ключи environ (HTTP_*)."""
+    status = []
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': BytesIO(body),
+        'wsgi.errors': BytesIO(),
+        'wsgi.url_scheme': 'http',
+        **headers,
+    }
+    response = application(
+        environ, lambda code, headers: status.append(int(code[:3]))
+    )
+    try:
+        b''.join(response)
+    finally:
+        response.close()
+    return status[0]
+
+
+async def asgi_get(application, path):
+    status = []
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'root_path': '',
+        'query_string': b'',
+        'headers': [(b'host', b'localhost')],
+        'client': ('127.0.0.1', 0),
+        'server': ('localhost', 80),
+    }
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+
+    await application(scope, receive, send)
+    return status[0]
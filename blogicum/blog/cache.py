@@ -0,0 +1,240 @@
+import asyncio
+import math
+import time
+from collections import Counter
+from functools import wraps
+from threading import Lock
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from blog.constants import POST_CARD_VERSION
+from blog.scheduler import get_next_due
+from blog.service import use_cursor_pagination
+
+_stats = Counter()
+_stats_lock = Lock()
+
+
+def _count(event):
+    with _stats_lock:
+        _stats[event] += 1
+
+
+def card_cache_stats():
+    with _stats_lock:
+        return {'hits': _stats['card_hits'], 'misses': _stats['card_misses']}
+
+
+def feed_cache_stats():
+    with _stats_lock:
+        return {'hits': _stats['feed_hits'], 'misses': _stats['feed_misses']}
+
+
+def reset_card_cache_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def get_card_cache():
+    return caches[settings.BLOG_POST_CARD_CACHE]
+
+
+def post_card_key(post_id):
+    return f'post_card:{post_id}:{POST_CARD_VERSION}'
+
+
+def render_post_card(post):
+    cache = get_card_cache()
+    key = post_card_key(post.pk)
+    html = cache.get(key)
+    if html is not None:
+        _count('card_hits')
+        return html
+
+    _count('card_misses')
+    html = render_to_string('includes/post_card.html', {'post': post})
+    cache.set(key, html, settings.BLOG_POST_CARD_TIMEOUT)
+    return html
+
+
+def invalidate_post_cards(post_ids):
+    keys = [post_card_key(post_id) for post_id in post_ids]
+    if not keys:
+        return
+
+    cache = get_card_cache()
+    cache.delete_many(keys)
+    # Повторная очистка после коммита: параллельный запрос мог успеть
+    # закешировать карточку по ещё не закоммиченным данным.
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+# Кеш страниц лент для анонимных посетителей.
+# Ключ страницы содержит поколение своей области (index, category:<slug>,
+# profile:<username>) и общее поколение ALL_FEEDS; смена поколения делает
+# недоступными сразу все страницы области.
+ALL_FEEDS = 'all'
+
+
+def get_feed_cache():
+    return caches[settings.BLOG_FEED_CACHE]
+
+
+def is_shared_cache(cache):
+    """Кеш общий для процессов: запись одного видна остальным."""
+    return not isinstance(cache, (LocMemCache, DummyCache))
+
+
+def _generation_key(scope):
+    return f'feed_gen:{scope}'
+
+
+def feed_generations(scope):
+    """Поколения (ALL_FEEDS, scope); недостающие заводятся текущим временем.
+
+    Поколение — время последней инвалидации в наносекундах, поэтому в
+    общем для процессов кеше оно же служит версией ленты для ETag и
+    Last-Modified (blog.conditional).
+    """
+    cache = get_feed_cache()
+    keys = [_generation_key(ALL_FEEDS), _generation_key(scope)]
+    generations = cache.get_many(keys)
+    missing = [key for key in keys if key not in generations]
+    if missing:
+        now = time.time_ns()
+        for key in missing:
+            cache.add(key, now, None)
+        generations.update(cache.get_many(missing))
+    return tuple(generations.get(key, 0) for key in keys)
+
+
+def feed_page_key(scope, request):
+    # Режим пагинации отдельно: «/?cursor=» — первая страница в режиме
+    # курсора, а не та же страница, что «/».
+    if use_cursor_pagination(request):
+        position = 'cursor:' + request.GET.get('cursor', '')
+    else:
+        position = 'page:' + request.GET.get('page', '')
+    return 'feed_page:{}:{}:{}:{}:{}'.format(
+        scope,
+        *feed_generations(scope),
+        request.path,
+        position,
+    )
+
+
+def invalidate_feeds(scopes):
+    scopes = set(scopes)
+    if not scopes:
+        return
+
+    cache = get_feed_cache()
+
+    def bump():
+        # Время вместо счётчика: вытесненное поколение не повторится.
+        generation = time.time_ns()
+        cache.set_many(
+            {_generation_key(scope): generation for scope in scopes},
+            None
+        )
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def feed_page_timeout():
+    """TTL страницы, но не дольше, чем до ближайшей отложенной публикации."""
+    timeout = settings.BLOG_FEED_CACHE_TIMEOUT
+    if not timeout:
+        return timeout
+
+    next_due = get_next_due()
+    if next_due is not None:
+        until_due = (next_due - timezone.now()).total_seconds()
+        timeout = min(timeout, max(math.ceil(until_due), 0))
+    return timeout
+
+
+def _cached_feed_page(request, scope):
+    """(ключ, ответ из кеша); ключ None — страницу кешировать нельзя."""
+    if request.method != 'GET' or request.user.is_authenticated:
+        return None, None
+
+    key = feed_page_key(scope, request)
+    response = get_feed_cache().get(key)
+    _count('feed_misses' if response is None else 'feed_hits')
+    return key, response
+
+
+# Валидаторы ставит blog.conditional на каждый ответ заново: из кеша они
+# вернулись бы с версией на момент сохранения страницы.
+VALIDATOR_HEADERS = ('ETag', 'Last-Modified')
+
+
+def _store_feed_page(key, response):
+    if response.status_code != 200 or response.cookies:
+        return
+
+    def store(response):
+        timeout = feed_page_timeout()
+        if not timeout:
+            return
+        validators = {
+            header: response[header]
+            for header in VALIDATOR_HEADERS if response.has_header(header)
+        }
+        for header in validators:
+            del response[header]
+        try:
+            get_feed_cache().set(key, response, timeout)
+        finally:
+            for header, value in validators.items():
+                response[header] = value
+
+    if getattr(response, 'is_rendered', True):
+        store(response)
+    else:
+        response.add_post_render_callback(store)
+
+
+def cache_anonymous_feed(get_scope):
+    """Кеширует GET-ответы ленты для анонимов; get_scope(kwargs) -> область.
+
+    Подходит и для асинхронных view: обращения к кешу и сессии тогда
+    выполняются через sync_to_async.
+    """
+
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                key, response = await sync_to_async(_cached_feed_page)(
+                    request, get_scope(kwargs)
+                )
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                    if key is not None:
+                        await sync_to_async(_store_feed_page)(key, response)
+                return response
+
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            key, response = _cached_feed_page(request, get_scope(kwargs))
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if key is not None:
+                    _store_feed_page(key, response)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,159 @@
+"""Условные GET для лент и страницы поста: ETag и Last-Modified.
+
+Версия ленты — поколения кеша лент (blog.cache.feed_generations): их
+сдвигает каждая запись, влияющая на ленту, а значение — время сдвига, так
+что проверка не обращается к базе. Поколения в LocMem у каждого процесса
+свои, и запись в другом процессе их не сдвинет, поэтому ленты получают
+валидаторы, только если BLOG_FEED_CACHE общий для процессов (Redis,
+Memcached, база, файлы). Версия из базы — Max(updated_at) и число видимых
+постов — стоила бы обхода индекса всей ленты на каждый запрос.
+
+У «Популярного» к версии добавляется шаг нижней границы счёта
+(blog.ranking.window_step): посты выпадают из ленты со временем.
+
+Версия поста — его updated_at, видимость и счётчик комментариев; пост
+загружается один раз и переиспользуется представлением. Совпал
+валидатор — ответ 304 отдаётся до рендера шаблона и до кеша лент.
+
+Страница зависит от пользователя, поэтому его id входит в ETag, а
+Last-Modified получают только анонимы: дата одна для всех, и после входа
+или выхода по ней вернулась бы чужая версия страницы.
+"""
+import asyncio
+import hashlib
+from calendar import timegm
+from datetime import datetime, timezone
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.utils import timezone as django_timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import condition
+
+from blog.cache import feed_generations, get_feed_cache, is_shared_cache
+from blog.lookups import categories
+from blog.ranking import window_step, window_step_start
+from blog.scheduler import publish_due_posts_if_needed
+from blog.service import get_post_list
+
+
+def async_condition(etag_func, last_modified_func):
+    """condition() для асинхронных view: в Django 3.2 он их не
+    поддерживает. Валидаторы считаются через sync_to_async.
+    """
+
+    def validators(request, *args, **kwargs):
+        etag = etag_func(request, *args, **kwargs)
+        modified = last_modified_func(request, *args, **kwargs)
+        return (
+            quote_etag(etag) if etag is not None else None,
+            timegm(modified.utctimetuple()) if modified else None,
+        )
+
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            etag, modified = await sync_to_async(validators)(
+                request, *args, **kwargs
+            )
+            response = get_conditional_response(
+                request, etag=etag, last_modified=modified
+            )
+            if response is None:
+                response = await view(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD'):
+                if modified and not response.has_header('Last-Modified'):
+                    response['Last-Modified'] = http_date(modified)
+                if etag:
+                    response.headers.setdefault('ETag', etag)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def conditional_page(get_state):
+    """get_state(request, **kwargs) -> (версия, дата изменения) или None.
+
+    None — страницы нет или она недоступна: валидаторы не отдаются.
+    """
+
+    def state(request, **kwargs):
+        # condition() спрашивает ETag и дату по отдельности.
+        if not hasattr(request, '_page_state'):
+            request._page_state = get_state(request, **kwargs)
+        return request._page_state
+
+    def etag(request, *args, **kwargs):
+        page_state = state(request, **kwargs)
+        if page_state is None:
+            return None
+        version = repr(
+            (request.get_full_path(), request.user.pk, page_state[0])
+        )
+        return hashlib.md5(version.encode()).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        page_state = state(request, **kwargs)
+        if page_state is None or request.user.is_authenticated:
+            return None
+        return page_state[1]
+
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+            return async_condition(etag, last_modified)(view)
+        return condition(
+            etag_func=etag, last_modified_func=last_modified
+        )(view)
+
+    return decorator
+
+
+def feed_state(scope):
+    if not is_shared_cache(get_feed_cache()):
+        return None
+    # Наступившие отложенные публикации сдвигают поколение до сравнения.
+    publish_due_posts_if_needed()
+    generations = feed_generations(scope)
+    modified = datetime.fromtimestamp(
+        max(generations) / 1e9, tz=timezone.utc
+    )
+    return generations, modified
+
+
+def index_state(request):
+    return feed_state('index')
+
+
+def popular_state(request):
+    state = feed_state('popular')
+    if state is None:
+        return None
+    # Нижняя граница счёта растёт со временем, и посты выпадают из ленты
+    # без записей: версия включает её шаг.
+    generations, modified = state
+    step = window_step(django_timezone.now())
+    return (generations, step), max(modified, window_step_start(step))
+
+
+def category_state(request, category_slug):
+    category = categories.get_by_slug(category_slug)
+    if category is None or not category.is_published:
+        return None
+    return feed_state(f'category:{category_slug}')
+
+
+def post_state(request, pk):
+    publish_due_posts_if_needed()
+    post = get_post_list().filter(pk=pk).first()
+    if post is None:
+        return None
+    request.loaded_post = post
+    if not post.is_visible and post.author_id != request.user.id:
+        return None
+    return (
+        (post.updated_at, post.is_visible, post.comment_count),
+        post.updated_at
+    )
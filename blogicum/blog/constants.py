@@ -1,2 +1,7 @@
 PAGINATE_BY = 10
 TITLE_CUT = 21
+COMMENTS_PER_PAGE = 20
+# Меняется вместе с разметкой includes/post_card.html.
+POST_CARD_VERSION = 1
+IMAGE_VARIANT_WIDTHS = (320, 640)
+SEARCH_RESULTS_LIMIT = 500
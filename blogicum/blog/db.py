@@ -0,0 +1,38 @@
+import re
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+# busy_timeout первым: смена journal_mode ждёт блокировку, а не падает
+# с «database is locked», пока её меняет соседнее соединение.
+SQLITE_PRAGMAS = (
+    'busy_timeout', 'journal_mode', 'synchronous', 'mmap_size', 'cache_size'
+)
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """PRAGMA из BLOG_SQLITE_PRAGMAS для каждого нового соединения SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+
+    pragmas = settings.BLOG_SQLITE_PRAGMAS
+    for name, value in pragmas.items():
+        if name not in SQLITE_PRAGMAS or not re.fullmatch(
+            r'-?\d+|[a-z]+', str(value).lower()
+        ):
+            raise ValueError(f'Недопустимая настройка SQLite: {name}={value}')
+
+    raw = connection.connection
+    for name in SQLITE_PRAGMAS:
+        if name not in pragmas:
+            continue
+        value = pragmas[name]
+        # Режим журнала хранится в файле базы: меняем, только если он
+        # другой, — смена требует монопольной блокировки.
+        if name == 'journal_mode' and raw.execute(
+            'PRAGMA journal_mode'
+        ).fetchone()[0] == str(value).lower():
+            continue
+        raw.execute(f'PRAGMA {name} = {value}')
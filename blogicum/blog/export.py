@@ -0,0 +1,138 @@
+"""Потоковая выгрузка постов с комментариями в NDJSON и CSV.
+
+Посты читаются iterator(chunk_size=...) в порядке id, комментарии —
+одним запросом на пачку постов, поэтому память не зависит от объёма базы.
+Выгрузку можно продолжить с места обрыва: after_id — последний
+полученный id поста.
+"""
+import csv
+import json
+from datetime import datetime, time
+from itertools import islice
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from blog.models import Comments, Post
+
+EXPORT_CHUNK_SIZE = 500
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
+CSV_FIELDS = (
+    'record', 'id', 'post_id', 'author', 'category', 'location', 'title',
+    'text', 'is_published', 'pub_date', 'created_at',
+)
+
+
+def parse_moment(value, end_of_day=False):
+    """Дата или дата-время из строки; ValueError для неверного формата."""
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Неверная дата: {value!r}.')
+        moment = datetime.combine(day, time.max if end_of_day else time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def export_queryset(date_from=None, date_to=None, category=None, author=None,
+                    after_id=None):
+    post_list = Post.objects.select_related(
+        'author', 'category', 'location'
+    ).order_by('pk')
+    if date_from:
+        post_list = post_list.filter(pub_date__gte=parse_moment(date_from))
+    if date_to:
+        post_list = post_list.filter(
+            pub_date__lte=parse_moment(date_to, end_of_day=True)
+        )
+    if category:
+        post_list = post_list.filter(category__slug=category)
+    if author:
+        post_list = post_list.filter(author__username=author)
+    if after_id:
+        post_list = post_list.filter(pk__gt=int(after_id))
+    return post_list
+
+
+def post_record(post, comments):
+    return {
+        'id': post.pk,
+        'title': post.title,
+        'text': post.text,
+        'is_published': post.is_published,
+        'pub_date': post.pub_date.isoformat(),
+        'created_at': post.created_at.isoformat(),
+        'author': {'id': post.author_id, 'username': post.author.username},
+        'category': post.category and {
+            'id': post.category.pk,
+            'slug': post.category.slug,
+            'title': post.category.title,
+        },
+        'location': post.location and {
+            'id': post.location.pk,
+            'name': post.location.name,
+        },
+        'comments': [
+            {
+                'id': comment.pk,
+                'author': comment.author.username,
+                'text': comment.text,
+                'created_at': comment.created_at.isoformat(),
+            }
+            for comment in comments
+        ],
+    }
+
+
+def iter_post_records(post_list, chunk_size=EXPORT_CHUNK_SIZE):
+    posts = post_list.iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(posts, chunk_size))
+        if not chunk:
+            return
+        comments = {post.pk: [] for post in chunk}
+        for comment in Comments.objects.filter(
+            post_id__in=comments
+        ).select_related('author').order_by('post_id', 'created_at', 'pk'):
+            comments[comment.post_id].append(comment)
+        for post in chunk:
+            yield post_record(post, comments[post.pk])
+
+
+def ndjson_lines(records):
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+class _Line:
+    """Файлоподобный буфер на одну строку для csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(records):
+    writer = csv.writer(_Line())
+    yield writer.writerow(CSV_FIELDS)
+    for record in records:
+        yield writer.writerow((
+            'post', record['id'], '', record['author']['username'],
+            record['category'] and record['category']['slug'],
+            record['location'] and record['location']['name'],
+            record['title'], record['text'], record['is_published'],
+            record['pub_date'], record['created_at'],
+        ))
+        for comment in record['comments']:
+            yield writer.writerow((
+                'comment', comment['id'], record['id'], comment['author'],
+                '', '', '', comment['text'], '', '', comment['created_at'],
+            ))
+
+
+def export_lines(export_format, records):
+    return (csv_lines if export_format == 'csv' else ndjson_lines)(records)
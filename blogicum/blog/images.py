@@ -0,0 +1,108 @@
+import logging
+import posixpath
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO
+from threading import Lock
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, ImageOps
+
+from blog.constants import IMAGE_VARIANT_WIDTHS
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+}
+
+_executor = None
+_executor_lock = Lock()
+
+
+def variant_name(name, width, extension):
+    stem, _ = posixpath.splitext(name)
+    return f'{stem}_{width}w.{extension}'
+
+
+def generate_variants(name, force=False):
+    """Сохраняет рядом с оригиналом уменьшенные копии в JPEG и WebP."""
+    with default_storage.open(name) as file:
+        original = ImageOps.exif_transpose(Image.open(file))
+        original.load()
+    if original.mode not in ('RGB', 'L'):
+        original = original.convert('RGB')
+
+    created = []
+    for width in IMAGE_VARIANT_WIDTHS:
+        if width >= original.width:
+            continue
+        resized = original.copy()
+        resized.thumbnail((width, width * 10), Image.LANCZOS)
+        for extension, (image_format, options) in FORMATS.items():
+            target = variant_name(name, width, extension)
+            if default_storage.exists(target):
+                if not force:
+                    continue
+                default_storage.delete(target)
+            buffer = BytesIO()
+            resized.save(buffer, image_format, **options)
+            default_storage.save(target, ContentFile(buffer.getvalue()))
+            created.append(target)
+    return created
+
+
+def get_variants(name):
+    """Готовые варианты: {'jpg': [(url, ширина)], 'webp': [...]}."""
+    variants = {extension: [] for extension in FORMATS}
+    for width in IMAGE_VARIANT_WIDTHS:
+        for extension in FORMATS:
+            target = variant_name(name, width, extension)
+            if default_storage.exists(target):
+                variants[extension].append(
+                    (default_storage.url(target), width)
+                )
+    return variants
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            executor_class = (
+                ProcessPoolExecutor
+                if settings.BLOG_IMAGE_PROCESSING == 'process'
+                else ThreadPoolExecutor
+            )
+            _executor = executor_class(
+                max_workers=settings.BLOG_IMAGE_WORKERS
+            )
+        return _executor
+
+
+def _log_failure(future):
+    if future.exception() is not None:
+        logger.error(
+            'Не удалось обработать изображение',
+            exc_info=future.exception()
+        )
+
+
+def process_post_image(post_id, name, on_done=None):
+    """Ставит генерацию вариантов в фоновую очередь после коммита."""
+    if settings.BLOG_IMAGE_PROCESSING == 'sync':
+        generate_variants(name)
+        if on_done:
+            on_done(post_id)
+        return
+
+    def submit():
+        future = get_executor().submit(generate_variants, name)
+        future.add_done_callback(_log_failure)
+        if on_done:
+            future.add_done_callback(lambda _: on_done(post_id))
+
+    transaction.on_commit(submit)
@@ -0,0 +1,285 @@
+"""Потоковый импорт дампа dumpdata (JSON-массив или JSON Lines).
+
+Файл читается по частям, объекты копятся в буферах по моделям и
+вставляются bulk_create пачками в транзакциях; буферы моделей, на которые
+ссылается пачка, сбрасываются раньше неё. Строки со ссылкой на ещё не
+встреченный объект откладываются во временный файл и повторяются в конце.
+Память ограничена размером пачки, а не размером дампа.
+"""
+import json
+import tempfile
+from collections import Counter
+from contextlib import contextmanager
+
+from django.core import serializers
+from django.core.exceptions import ValidationError
+from django.core.management.color import no_style
+from django.core.serializers.base import DeserializationError
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from blog.cache import ALL_FEEDS, invalidate_feeds
+from blog.lookups import categories, locations
+from blog.models import Category, Comments, Location, Post, User
+from blog.ranking import rank_posts
+from blog.scheduler import is_post_visible, reset_next_due
+from blog.search import index_posts
+from blog.service import recount_comments
+
+# Модели в порядке зависимостей: каждая ссылается только на предыдущие.
+IMPORT_MODELS = (User, Category, Location, Post, Comments)
+MAX_ERROR_SAMPLES = 20
+
+
+def iter_json_objects(file, read_size=64 * 1024):
+    """Объекты верхнего уровня JSON-массива или JSON Lines по мере чтения."""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    eof = False
+    while True:
+        buffer = buffer.lstrip(' \t\r\n,[]')
+        if buffer:
+            try:
+                obj, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                yield obj
+                buffer = buffer[end:]
+                continue
+        elif eof:
+            return
+
+        chunk = file.read(read_size)
+        eof = not chunk
+        buffer += chunk
+
+
+@contextmanager
+def explicit_dates(model, objects):
+    """Вставка без перезаписи дат auto_now и auto_now_add значениями
+    «сейчас»: bulk_create и save() вызывают pre_save полей. Пустые даты
+    заполняются текущим временем. Флаги полей меняются на время вставки
+    для всего процесса — только для команд импорта и генерации.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+        or getattr(field, 'auto_now_add', False)
+    ]
+    now = timezone.now()
+    for obj in objects:
+        for field in fields:
+            if getattr(obj, field.attname) is None:
+                setattr(obj, field.attname, now)
+    flags = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in flags:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class DumpImporter:
+
+    def __init__(self, batch_size=1000, on_progress=None):
+        self.batch_size = batch_size
+        self.on_progress = on_progress
+        self.labels = {
+            model._meta.label_lower: model for model in IMPORT_MODELS
+        }
+        self.buffers = {model: {} for model in IMPORT_MODELS}
+        self.stats = Counter()
+        self.errors = []
+        self.deferred = None
+        self.final_pass = False
+
+    def error(self, record, message):
+        self.stats['errors'] += 1
+        if len(self.errors) < MAX_ERROR_SAMPLES:
+            self.errors.append(
+                f"{record.get('model')} pk={record.get('pk')}: {message}"
+            )
+
+    def add(self, record):
+        model = self.labels.get(str(record.get('model', '')).lower())
+        if model is None:
+            self.stats['skipped'] += 1
+            return
+        try:
+            deserialized = next(serializers.deserialize(
+                'python', [record], ignorenonexistent=True
+            ))
+        except DeserializationError as error:
+            self.error(record, error)
+            return
+
+        buffer = self.buffers[model]
+        buffer[deserialized.object.pk] = (deserialized.object, record)
+        if len(buffer) >= self.batch_size:
+            self.flush(model)
+
+    def flush(self, model):
+        # Сначала то, на что пачка может ссылаться.
+        for dependency in IMPORT_MODELS[:IMPORT_MODELS.index(model)]:
+            if self.buffers[dependency]:
+                self.flush(dependency)
+
+        rows = self.buffers[model]
+        self.buffers[model] = {}
+        if not rows:
+            return
+
+        existing = set(model._base_manager.filter(
+            pk__in=list(rows)
+        ).values_list('pk', flat=True))
+        self.stats['existing'] += len(existing)
+        rows = [row for pk, row in rows.items() if pk not in existing]
+
+        rows = self.resolve_foreign_keys(model, rows)
+        objects = []
+        for obj, record in rows:
+            try:
+                obj.full_clean(
+                    exclude=[field.name for field in self.foreign_keys(model)],
+                    validate_unique=False
+                )
+            except ValidationError as error:
+                self.error(record, error)
+            else:
+                objects.append((obj, record))
+
+        if model is Post:
+            self.prepare_posts([obj for obj, _ in objects])
+        inserted = self.insert(model, objects)
+        self.after_insert(model, inserted)
+        self.stats[model._meta.label_lower] += len(inserted)
+        self.stats['rows'] += len(inserted)
+        if self.on_progress:
+            self.on_progress(self.stats)
+
+    @staticmethod
+    def foreign_keys(model):
+        return [
+            field for field in model._meta.concrete_fields
+            if field.is_relation and field.related_model in IMPORT_MODELS
+        ]
+
+    def resolve_foreign_keys(self, model, rows):
+        for field in self.foreign_keys(model):
+            ids = {
+                getattr(obj, field.attname) for obj, _ in rows
+            } - {None}
+            found = set(field.related_model._base_manager.filter(
+                pk__in=ids
+            ).values_list('pk', flat=True))
+            resolved = []
+            for obj, record in rows:
+                value = getattr(obj, field.attname)
+                if value is None or value in found:
+                    resolved.append((obj, record))
+                elif self.final_pass:
+                    self.error(record, f'нет {field.name} с id={value}')
+                else:
+                    self.defer(record)
+            rows = resolved
+        return rows
+
+    def defer(self, record):
+        if self.deferred is None:
+            self.deferred = tempfile.TemporaryFile('w+', encoding='utf-8')
+        self.deferred.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.stats['deferred'] += 1
+
+    def prepare_posts(self, posts):
+        # bulk_create не вызывает сигналы: видимость считается здесь.
+        # Категории и местоположения пачки — двумя запросами, они же
+        # нужны поисковому индексу.
+        for name, model in (('category', Category), ('location', Location)):
+            field = Post._meta.get_field(name)
+            related = model.objects.in_bulk(
+                {getattr(post, field.attname) for post in posts} - {None}
+            )
+            for post in posts:
+                field.set_cached_value(
+                    post, related.get(getattr(post, field.attname))
+                )
+        for post in posts:
+            post.is_visible = is_post_visible(post)
+
+    def insert(self, model, rows):
+        with explicit_dates(model, [obj for obj, _ in rows]):
+            return self.insert_rows(model, rows)
+
+    def insert_rows(self, model, rows):
+        objects = [obj for obj, _ in rows]
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create(objects)
+            return objects
+        except IntegrityError:
+            pass
+
+        # Конфликт в пачке: вставляем по одной, чтобы отсеять только
+        # проблемные строки.
+        inserted = []
+        with transaction.atomic():
+            for obj, record in rows:
+                try:
+                    with transaction.atomic():
+                        obj.save(force_insert=True)
+                except IntegrityError as error:
+                    self.error(record, error)
+                else:
+                    inserted.append(obj)
+        return inserted
+
+    def after_insert(self, model, objects):
+        if not objects:
+            return
+        if model is Post:
+            index_posts(objects)
+            rank_posts(post.pk for post in objects)
+        elif model is Comments:
+            post_ids = {comment.post_id for comment in objects}
+            recount_comments(Post.objects.filter(pk__in=post_ids))
+            rank_posts(post_ids)
+
+    def run(self, records):
+        for record in records:
+            self.add(record)
+        self.flush_all()
+
+        if self.deferred is not None:
+            self.final_pass = True
+            self.deferred.seek(0)
+            deferred, self.deferred = self.deferred, None
+            with deferred:
+                for line in deferred:
+                    self.add(json.loads(line))
+            self.flush_all()
+
+        self.finish()
+        return self.stats
+
+    def flush_all(self):
+        for model in IMPORT_MODELS:
+            self.flush(model)
+
+    def finish(self):
+        # Вставка с явными pk не двигает последовательности PostgreSQL.
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), list(IMPORT_MODELS)
+        )
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+        categories.invalidate()
+        locations.invalidate()
+        reset_next_due()
+        invalidate_feeds([ALL_FEEDS])
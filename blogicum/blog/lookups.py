@@ -0,0 +1,106 @@
+"""Категории и местоположения в памяти процесса.
+
+Таблицы маленькие и меняются редко: ленты выбирают посты без JOIN и
+подставляют post.category и post.location из снимка. Снимок сбрасывают
+сигналы сохранения и удаления (сразу и после коммита), а в остальных
+процессах он устаревает не дольше чем на BLOG_LOOKUP_TIMEOUT секунд;
+объекты, которых в снимке ещё нет, читаются из базы.
+Объекты снимка общие для всех запросов: их нельзя изменять.
+"""
+import time
+from threading import Lock
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.query import ModelIterable
+
+from blog.models import Category, Location, Post
+
+
+class ModelLookup:
+
+    def __init__(self, model, slug_field=None):
+        self.model = model
+        self.slug_field = slug_field
+        self._lock = Lock()
+        self._snapshot = None
+
+    def _load(self):
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() < snapshot[2]:
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is not snapshot:
+                return self._snapshot
+            objects = list(self.model.objects.all())
+            by_slug = (
+                {getattr(obj, self.slug_field): obj for obj in objects}
+                if self.slug_field else {}
+            )
+            self._snapshot = (
+                {obj.pk: obj for obj in objects},
+                by_slug,
+                time.monotonic() + settings.BLOG_LOOKUP_TIMEOUT,
+            )
+            return self._snapshot
+
+    def get(self, pk):
+        return self._load()[0].get(pk)
+
+    def get_by_slug(self, slug):
+        obj = self._load()[1].get(slug)
+        if obj is None:
+            # Объекта нет в снимке: возможно, он создан в другом процессе.
+            # Ищем в базе и, если нашёлся, перечитываем снимок.
+            obj = self.model.objects.filter(
+                **{self.slug_field: slug}
+            ).first()
+            if obj is not None:
+                self.clear()
+        return obj
+
+    def clear(self):
+        self._snapshot = None
+
+    def invalidate(self):
+        self.clear()
+        # Параллельный запрос мог успеть загрузить ещё старые данные.
+        transaction.on_commit(self.clear)
+
+
+categories = ModelLookup(Category, slug_field='slug')
+locations = ModelLookup(Location)
+
+# Поле внешнего ключа поста -> его справочник.
+POST_LOOKUPS = (
+    (Post._meta.get_field('category'), categories),
+    (Post._meta.get_field('location'), locations),
+)
+
+
+def attach_lookups(post):
+    for field, lookup in POST_LOOKUPS:
+        pk = getattr(post, field.attname)
+        obj = None if pk is None else lookup.get(pk)
+        if pk is not None and obj is None:
+            # Объекта нет в снимке: он создан в другом процессе. Django
+            # загрузит его сам, а снимок перечитается при следующем обращении.
+            lookup.clear()
+            continue
+        field.set_cached_value(post, obj)
+    return post
+
+
+class CachedLookupIterable(ModelIterable):
+
+    def __iter__(self):
+        for post in super().__iter__():
+            yield attach_lookups(post)
+
+
+def with_cached_lookups(queryset):
+    """Посты из queryset получают категорию и местоположение из памяти."""
+    queryset = queryset.all()
+    queryset._iterable_class = CachedLookupIterable
+    return queryset
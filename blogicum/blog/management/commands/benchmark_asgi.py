@@ -0,0 +1,150 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.benchmarking import (asgi_get, get_sample_kwargs, reload_urlconf,
+                               wsgi_request)
+from blog.profiling import percentile
+from blogicum.asgi import thread_per_request
+
+# Страницы, у которых есть асинхронные версии.
+URL_NAMES = (
+    ('blog:index', ()),
+    ('blog:category_posts', ('category_slug',)),
+    ('blog:profile', ('username',)),
+    ('blog:post_detail', ('pk',)),
+)
+
+# (режим, обработчик, асинхронные view)
+MODES = (
+    ('wsgi', 'wsgi', False),
+    ('asgi', 'asgi', False),
+    ('asgi-async', 'asgi', True),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность ленты, категории, профиля и '
+        'поста под WSGI и ASGI (с синхронными и асинхронными view) '
+        'при заданном числе одновременных запросов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Отключить кеш страниц лент для анонимов.'
+        )
+        parser.add_argument('--output', help='Файл для JSON-результатов.')
+
+    def handle(self, *args, **options):
+        timeout = 0 if options['cold'] else settings.BLOG_FEED_CACHE_TIMEOUT
+        _, kwargs = get_sample_kwargs()
+        urls = {
+            name: reverse(name, kwargs={param: kwargs[param]
+                                        for param in params})
+            for name, params in URL_NAMES
+        }
+
+        results = {}
+        try:
+            for mode, handler, async_views in MODES:
+                # Без debug_toolbar: он только синхронный и под ASGI
+                # добавил бы переход между потоками на каждый запрос.
+                with override_settings(
+                    DEBUG=False,
+                    MIDDLEWARE=[
+                        middleware for middleware in settings.MIDDLEWARE
+                        if not middleware.startswith('debug_toolbar')
+                    ],
+                    BLOG_ASYNC_VIEWS=async_views,
+                    BLOG_FEED_CACHE_TIMEOUT=timeout,
+                ):
+                    reload_urlconf()
+                    results[mode] = self.run_mode(
+                        mode, handler, urls, options
+                    )
+        finally:
+            reload_urlconf()
+
+        report = {
+            'created_at': timezone.now().isoformat(),
+            'requests': options['requests'],
+            'concurrency': options['concurrency'],
+            'cold': options['cold'],
+            'modes': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+
+    def run_mode(self, mode, handler, urls, options):
+        results = {}
+        for name, url in urls.items():
+            for cache in caches.all():
+                cache.clear()
+            if handler == 'wsgi':
+                timings, statuses, elapsed = self.run_wsgi(url, options)
+            else:
+                timings, statuses, elapsed = asyncio.run(
+                    self.run_asgi(url, options)
+                )
+            results[name] = {
+                'url': url,
+                'statuses': sorted(set(statuses)),
+                'rps': round(len(timings) / elapsed, 1),
+                'p50_ms': round(percentile(timings, 0.5), 3),
+                'p99_ms': round(percentile(timings, 0.99), 3),
+            }
+            self.stdout.write(
+                '{mode:<11} {name:<20} {rps:>8.1f} req/s '
+                'p50={p50_ms:>8.2f}ms p99={p99_ms:>8.2f}ms'.format(
+                    mode=mode, name=name,
+                    **results[name]
+                )
+            )
+        return results
+
+    def run_wsgi(self, url, options):
+        application = WSGIHandler()
+
+        def timed(_):
+            started = time.perf_counter()
+            status = wsgi_request(application, url)
+            return (time.perf_counter() - started) * 1000, status
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options['concurrency']) as executor:
+            runs = list(executor.map(timed, range(options['requests'])))
+        elapsed = time.perf_counter() - started
+        return [run[0] for run in runs], [run[1] for run in runs], elapsed
+
+    async def run_asgi(self, url, options):
+        application = thread_per_request(ASGIHandler())
+
+        semaphore = asyncio.Semaphore(options['concurrency'])
+
+        async def timed():
+            async with semaphore:
+                started = time.perf_counter()
+                status = await asgi_get(application, url)
+                return (time.perf_counter() - started) * 1000, status
+
+        started = time.perf_counter()
+        runs = await asyncio.gather(
+            *(timed() for _ in range(options['requests']))
+        )
+        elapsed = time.perf_counter() - started
+        return [run[0] for run in runs], [run[1] for run in runs], elapsed
@@ -0,0 +1,106 @@
+import json
+import time
+from urllib.parse import urlencode
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.benchmarking import get_sample_kwargs, session_headers, wsgi_request
+from blog.profiling import percentile
+from blog.ratelimit import BACKENDS, get_backend
+
+# Лимит, который за время замера не исчерпать: меряется только проверка.
+UNREACHABLE_RATE = '1000000000/s'
+# Режим -> BLOG_RATE_LIMIT_BACKEND; None — ограничение выключено.
+MODES = {'off': None, **{name: name for name in BACKENDS}}
+
+
+class Command(BaseCommand):
+    help = (
+        'Меряет накладные расходы ограничения частоты: время take() '
+        'хранилищ корзин и p50 отправки комментария без лимитов и с '
+        'каждым хранилищем. Комментарии остаются в базе — запускайте на '
+        'копии.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=200)
+        parser.add_argument(
+            '--keys', type=int, default=1000,
+            help='Разных ключей в замере take().'
+        )
+        parser.add_argument('--output', help='Файл для JSON-результатов.')
+
+    def handle(self, *args, **options):
+        backends = {
+            name: self.measure_take(name, options) for name in BACKENDS
+        }
+        author, kwargs = get_sample_kwargs()
+        headers = session_headers(author)
+        url = f"/posts/{kwargs['pk']}/comment/"
+        requests = {
+            mode: self.measure_request(backend, url, headers, options)
+            for mode, backend in MODES.items()
+        }
+
+        for name, result in backends.items():
+            self.stdout.write(
+                f"take() {name:<8} {result['p50_us']:>8.2f} мкс"
+            )
+        baseline = requests['off']['p50_ms']
+        for mode, result in requests.items():
+            self.stdout.write(
+                f"POST {mode:<10} p50 {result['p50_ms']:>7.2f} ms "
+                f"({result['p50_ms'] - baseline:+.2f})"
+            )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump({
+                    'created_at': timezone.now().isoformat(),
+                    'repeat': options['repeat'],
+                    'take': backends,
+                    'requests': requests,
+                }, file, ensure_ascii=False, indent=2)
+
+    def measure_take(self, name, options):
+        with override_settings(BLOG_RATE_LIMIT_BACKEND=name):
+            backend = get_backend()
+        keys = [f'benchmark:{number}' for number in range(options['keys'])]
+        timings = []
+        for number in range(options['repeat']):
+            key = keys[number % len(keys)]
+            started = time.perf_counter()
+            backend.take(key, 1e9, 1e9)
+            timings.append((time.perf_counter() - started) * 1e6)
+        return {'p50_us': round(percentile(timings, 0.5), 3)}
+
+    def measure_request(self, backend, url, headers, options):
+        application = WSGIHandler()
+        limits = {} if backend is None else {
+            'comment': UNREACHABLE_RATE
+        }
+        body = urlencode({'text': 'Замер ограничения частоты'}).encode()
+        timings = []
+        statuses = set()
+        with override_settings(
+            DEBUG=False,
+            BLOG_RATE_LIMITS=limits,
+            BLOG_RATE_LIMIT_BACKEND=backend or 'memory',
+        ):
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                statuses.add(wsgi_request(
+                    application,
+                    url,
+                    method='POST',
+                    body=body,
+                    CONTENT_TYPE='application/x-www-form-urlencoded',
+                    **headers
+                ))
+                timings.append((time.perf_counter() - started) * 1000)
+        return {
+            'p50_ms': round(percentile(timings, 0.5), 3),
+            'statuses': sorted(statuses),
+        }
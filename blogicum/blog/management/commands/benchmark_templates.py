@@ -0,0 +1,122 @@
+import json
+import time
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.template.base import Template
+from django.test import Client, override_settings
+from django.test.utils import instrumented_test_render
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.benchmarking import get_sample_kwargs, iter_page_names
+from blog.profiling import collect_stats, percentile
+from blog.templating import template_settings, warm_template_cache
+
+MODES = {'uncached': False, 'cached': True}
+
+
+def page_template(client, url):
+    """Имя шаблона страницы (первого отрендеренного) или None."""
+    original = Template._render
+    Template._render = instrumented_test_render
+    try:
+        response = client.get(url)
+    finally:
+        Template._render = original
+    if response.status_code != 200 or not response.templates:
+        return None
+    return response.templates[0].name
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время рендеринга страниц с загрузкой шаблонов с диска '
+        'на каждый запрос и с кешируемым загрузчиком после прогрева.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--output', help='Файл для JSON-результатов.')
+
+    def handle(self, *args, **options):
+        author, kwargs = get_sample_kwargs()
+        client = Client(HTTP_HOST='localhost')
+        # Ленты анонимов отдаются из кеша страниц — нужны авторизованные.
+        client.force_login(author)
+
+        pages = {}
+        with override_settings(DEBUG=False):
+            for name, params in iter_page_names():
+                url = reverse(
+                    name, kwargs={param: kwargs[param] for param in params}
+                )
+                template = page_template(client, url)
+                if template is not None:
+                    pages[name] = {'url': url, 'template': template}
+
+        results = {}
+        for mode, cached in MODES.items():
+            with override_settings(
+                DEBUG=False, TEMPLATES=template_settings(cached)
+            ):
+                started = time.perf_counter()
+                templates = warm_template_cache() if cached else 0
+                warmup_ms = (time.perf_counter() - started) * 1000
+                results[mode] = {
+                    'warmup_ms': round(warmup_ms, 3),
+                    'templates': templates,
+                    'pages': {
+                        name: self.measure(client, page['url'], options)
+                        for name, page in pages.items()
+                    },
+                }
+
+        self.report(pages, results)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump({
+                    'created_at': timezone.now().isoformat(),
+                    'repeat': options['repeat'],
+                    'pages': pages,
+                    'modes': results,
+                }, file, ensure_ascii=False, indent=2)
+
+    def measure(self, client, url, options):
+        for cache in caches.all():
+            cache.clear()
+        # Первый запрос заполняет кеши карточек, сессии и справочников.
+        client.get(url)
+        runs = []
+        for _ in range(options['repeat']):
+            with collect_stats() as stats:
+                client.get(url)
+            runs.append(stats)
+        total = [run.total_time * 1000 for run in runs]
+        return {
+            'p50_ms': round(percentile(total, 0.5), 3),
+            'render_ms': round(
+                percentile([run.render_time * 1000 for run in runs], 0.5), 3
+            ),
+        }
+
+    def report(self, pages, results):
+        cached = results['cached']
+        self.stdout.write(
+            'Прогрев: {templates} шаблонов за {warmup_ms:.1f} мс.'.format(
+                **cached
+            )
+        )
+        for name, page in pages.items():
+            before = results['uncached']['pages'][name]
+            after = cached['pages'][name]
+            self.stdout.write(
+                '{name:<24} {template:<32} p50 {before:>7.2f} -> '
+                '{after:>7.2f} ms (x{speedup:.1f})'.format(
+                    name=name,
+                    template=page['template'],
+                    before=before['p50_ms'],
+                    after=after['p50_ms'],
+                    speedup=before['p50_ms'] / (after['p50_ms'] or 1),
+                )
+            )
@@ -0,0 +1,135 @@
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.benchmarking import get_sample_kwargs, iter_page_names
+from blog.models import Post
+from blog.profiling import collect_stats, percentile
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет p50/p99, число и время SQL-запросов и время рендеринга '
+        'для всех страниц blog и pages на текущей базе.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Очищать кеши перед каждым запросом.'
+        )
+        parser.add_argument('--output', help='Файл для JSON-результатов.')
+        parser.add_argument(
+            '--budgets',
+            help='JSON-файл с бюджетами; по умолчанию BLOG_BENCHMARK_BUDGETS.'
+        )
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Завершиться с ошибкой при превышении бюджета.'
+        )
+
+    def handle(self, *args, **options):
+        # Замеры без debug_toolbar и прочих отладочных накладных расходов.
+        with override_settings(DEBUG=False):
+            self.run(options)
+
+    def run(self, options):
+        author, kwargs = get_sample_kwargs()
+        anonymous = Client(HTTP_HOST='localhost')
+        logged_in = Client(HTTP_HOST='localhost')
+        logged_in.force_login(author)
+
+        results = {}
+        for name, params in iter_page_names():
+            results[name] = self.benchmark(
+                name,
+                {param: kwargs[param] for param in params},
+                anonymous,
+                logged_in,
+                options
+            )
+            self.report(name, results[name])
+
+        report = {
+            'created_at': timezone.now().isoformat(),
+            'database': str(settings.DATABASES['default']['NAME']),
+            'posts': Post.objects.count(),
+            'repeat': options['repeat'],
+            'cold': options['cold'],
+            'views': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+
+        if options['check']:
+            self.check_budgets(results, options['budgets'])
+
+    def benchmark(self, name, kwargs, anonymous, logged_in, options):
+        url = reverse(name, kwargs=kwargs)
+        client = anonymous
+        response = client.get(url)
+        if response.status_code == 302 and response.url.startswith(
+            settings.LOGIN_URL
+        ):
+            client = logged_in
+        for _ in range(options['warmup']):
+            client.get(url)
+
+        runs = []
+        for _ in range(options['repeat']):
+            if options['cold']:
+                for cache in caches.all():
+                    cache.clear()
+            with collect_stats() as stats:
+                response = client.get(url)
+            runs.append(stats)
+
+        total = [run.total_time * 1000 for run in runs]
+        return {
+            'url': url,
+            'authenticated': client is logged_in,
+            'status': response.status_code,
+            'p50_ms': round(percentile(total, 0.5), 3),
+            'p99_ms': round(percentile(total, 0.99), 3),
+            'queries': max(run.queries for run in runs),
+            'sql_ms': round(
+                percentile([run.sql_time * 1000 for run in runs], 0.5), 3
+            ),
+            'render_ms': round(
+                percentile([run.render_time * 1000 for run in runs], 0.5), 3
+            ),
+        }
+
+    def report(self, name, result):
+        self.stdout.write(
+            '{name:<20} {status} p50={p50_ms:>8.2f}ms p99={p99_ms:>8.2f}ms '
+            'sql={queries:>3}/{sql_ms:.2f}ms render={render_ms:.2f}ms'.format(
+                name=name, **result
+            )
+        )
+
+    def check_budgets(self, results, path):
+        budgets = settings.BLOG_BENCHMARK_BUDGETS
+        if path:
+            with open(path, encoding='utf-8') as file:
+                budgets = json.load(file)
+
+        violations = [
+            f'{name}: {metric} = {results[name][metric]} > {limit}'
+            for name, limits in budgets.items() if name in results
+            for metric, limit in limits.items()
+            if results[name][metric] > limit
+        ]
+        if violations:
+            raise CommandError(
+                'Превышены бюджеты:\n' + '\n'.join(violations)
+            )
+        self.stdout.write(self.style.SUCCESS('Все бюджеты соблюдены.'))
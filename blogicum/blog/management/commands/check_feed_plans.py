@@ -0,0 +1,60 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from blog.models import Comments
+from blog.scheduler import scheduled_posts
+from blog.service import filter_post_list, get_post_list, order_post_list
+
+FULL_SCAN_PATTERNS = {
+    'sqlite': re.compile(r'\bSCAN (?:TABLE )?(\w+)(?!.*\bUSING\b)'),
+    'postgresql': re.compile(r'\bSeq Scan on (\w+)'),
+}
+
+
+def get_feed_querysets():
+    return {
+        'index': order_post_list(
+            filter_post_list(get_post_list())
+        ),
+        'category': filter_post_list(get_post_list()).filter(
+            category_id=0
+        ).order_by('-pub_date'),
+        'profile': order_post_list(
+            get_post_list().filter(author_id=0)
+        ),
+        'profile_public': filter_post_list(order_post_list(
+            get_post_list().filter(author_id=0)
+        )),
+        'scheduled': scheduled_posts().order_by('pub_date')[:1],
+        'comments': Comments.objects.filter(
+            post_id=0
+        ).select_related('author'),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Проверяет планы запросов лент: EXPLAIN без полных сканирований.'
+
+    def handle(self, *args, **options):
+        pattern = FULL_SCAN_PATTERNS.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(
+                f'СУБД {connection.vendor} не поддерживается.'
+            )
+
+        failed = []
+        for name, queryset in get_feed_querysets().items():
+            plan = queryset.explain()
+            self.stdout.write(f'== {name}\n{plan}')
+            scans = pattern.findall(plan)
+            if scans:
+                failed.append(f'{name}: {", ".join(scans)}')
+
+        if failed:
+            raise CommandError(
+                'Полное сканирование таблиц в запросах лент:\n'
+                + '\n'.join(failed)
+            )
+        self.stdout.write(self.style.SUCCESS('Все ленты используют индексы.'))
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.export import (EXPORT_CHUNK_SIZE, EXPORT_FORMATS, export_lines,
+                         export_queryset, iter_post_records)
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково выгружает посты с комментариями, авторами, категориями '
+        'и местоположениями в NDJSON или CSV.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', choices=EXPORT_FORMATS, default='ndjson'
+        )
+        parser.add_argument('--output', help='Файл; по умолчанию stdout.')
+        parser.add_argument(
+            '--from', dest='date_from', help='Дата публикации от.'
+        )
+        parser.add_argument(
+            '--to', dest='date_to', help='Дата публикации до.'
+        )
+        parser.add_argument('--category', help='Slug категории.')
+        parser.add_argument('--author', help='Имя пользователя автора.')
+        parser.add_argument(
+            '--after-id', type=int,
+            help='Продолжить выгрузку после поста с этим id.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=EXPORT_CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options):
+        try:
+            post_list = export_queryset(
+                options['date_from'],
+                options['date_to'],
+                options['category'],
+                options['author'],
+                options['after_id'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+
+        lines = export_lines(
+            options['format'],
+            iter_post_records(post_list, options['chunk_size'])
+        )
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+
+        with open(
+            options['output'], 'w', encoding='utf-8', newline=''
+        ) as file:
+            file.writelines(lines)
@@ -0,0 +1,210 @@
+import random
+import time
+from datetime import timedelta
+from itertools import count, islice
+
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from blog.benchmarking import batched
+from blog.importing import explicit_dates
+from blog.models import Category, Comments, Location, Post, User
+from blog.ranking import rank_posts
+from blog.scheduler import reset_next_due
+from blog.search import index_posts
+
+WORDS = (
+    'день рождения праздник торт гости подарок лето море город прогулка '
+    'друзья кофе утро вечер поездка горы книга музыка фото история '
+    'новости погода кино выставка парк дорога дом семья работа отпуск'
+).split()
+# Среднее время от публикации до комментария: обсуждают в первые дни.
+COMMENT_DELAY_MEAN = timedelta(days=1).total_seconds()
+
+
+def next_pk(model):
+    return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+
+class Command(BaseCommand):
+    help = (
+        'Детерминированно генерирует пользователей, категории, '
+        'местоположения, посты и комментарии для нагрузочных тестов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--locations', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument(
+            '--comments-per-post', type=float, default=3,
+            help='Среднее число комментариев (экспоненциальное распределение).'
+        )
+        parser.add_argument(
+            '--author-skew', type=float, default=1.0,
+            help='Показатель Ципфа для числа постов на автора; 0 — равномерно.'
+        )
+        parser.add_argument(
+            '--days', type=int, default=3 * 365,
+            help='Глубина ленты в днях.'
+        )
+        parser.add_argument(
+            '--future-share', type=float, default=0.01,
+            help='Доля отложенных публикаций.'
+        )
+        parser.add_argument(
+            '--unpublished-share', type=float, default=0.02,
+            help='Доля снятых с публикации постов и категорий.'
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.options = options
+        self.now = timezone.now()
+        started = time.monotonic()
+
+        user_ids = self.create(User, self.users(), options['users'])
+        # Объекты, а не id: поисковому индексу нужны их названия.
+        categories = Category.objects.in_bulk(self.create(
+            Category, self.categories(), options['categories']
+        ))
+        locations = Location.objects.in_bulk(self.create(
+            Location, self.locations(), options['locations']
+        ))
+
+        posts = self.posts(user_ids, categories, locations)
+        created_posts = created_comments = 0
+        for batch in batched(posts, options['batch_size']):
+            comments = [
+                comment
+                for post in batch
+                for comment in self.comments(post, user_ids)
+            ]
+            with transaction.atomic():
+                Post.objects.bulk_create(batch)
+                with explicit_dates(Comments, comments):
+                    Comments.objects.bulk_create(
+                        comments, batch_size=options['batch_size']
+                    )
+                index_posts(batch)
+                rank_posts(post.pk for post in batch)
+            created_posts += len(batch)
+            created_comments += len(comments)
+            self.stdout.write(
+                f'Постов: {created_posts}, комментариев: {created_comments}'
+            )
+
+        reset_next_due()
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.monotonic() - started:.1f} с.'
+        ))
+
+    def create(self, model, objects, total):
+        first_pk = next_pk(model)
+        for batch in batched(objects, self.options['batch_size']):
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+        self.stdout.write(f'{model._meta.verbose_name_plural}: {total}')
+        return range(first_pk, first_pk + total)
+
+    def text(self, min_words, max_words):
+        return ' '.join(
+            self.rng.choices(WORDS, k=self.rng.randint(min_words, max_words))
+        ).capitalize()
+
+    def is_unpublished(self):
+        return self.rng.random() < self.options['unpublished_share']
+
+    def users(self):
+        first_pk = next_pk(User)
+        for pk in range(first_pk, first_pk + self.options['users']):
+            yield User(
+                pk=pk,
+                username=f'user{pk}',
+                email=f'user{pk}@example.com',
+                password=f'{UNUSABLE_PASSWORD_PREFIX}{pk}',
+            )
+
+    def categories(self):
+        first_pk = next_pk(Category)
+        for pk in range(first_pk, first_pk + self.options['categories']):
+            yield Category(
+                pk=pk,
+                title=self.text(1, 3),
+                description=self.text(5, 20),
+                slug=f'category-{pk}',
+                is_published=not self.is_unpublished(),
+            )
+
+    def locations(self):
+        first_pk = next_pk(Location)
+        for pk in range(first_pk, first_pk + self.options['locations']):
+            yield Location(pk=pk, name=self.text(1, 2))
+
+    def posts(self, user_ids, categories, locations):
+        skew = self.options['author_skew']
+        author_weights = [
+            1 / (rank ** skew) for rank in range(1, len(user_ids) + 1)
+        ]
+        cum_weights = []
+        total = 0
+        for weight in author_weights:
+            total += weight
+            cum_weights.append(total)
+
+        category_list = list(categories.values())
+        location_list = list(locations.values())
+        depth = timedelta(days=self.options['days']).total_seconds()
+        first_pk = next_pk(Post)
+        for pk in islice(count(first_pk), self.options['posts']):
+            if self.rng.random() < self.options['future_share']:
+                pub_date = self.now + timedelta(
+                    seconds=self.rng.uniform(60, 30 * 24 * 3600)
+                )
+            else:
+                pub_date = self.now - timedelta(
+                    seconds=self.rng.uniform(0, depth)
+                )
+            category = self.rng.choice(category_list)
+            is_published = not self.is_unpublished()
+            yield Post(
+                pk=pk,
+                title=self.text(2, 6),
+                text=self.text(20, 120),
+                pub_date=pub_date,
+                author_id=self.rng.choices(
+                    user_ids, cum_weights=cum_weights
+                )[0],
+                category=category,
+                location=self.rng.choice(location_list),
+                is_published=is_published,
+                is_visible=(
+                    is_published
+                    and category.is_published
+                    and pub_date <= self.now
+                ),
+                comment_count=int(self.rng.expovariate(
+                    1 / self.options['comments_per_post']
+                )) if self.options['comments_per_post'] else 0,
+            )
+
+    def comments(self, post, user_ids):
+        # У отложенного поста комментариев ещё нет.
+        if post.pub_date > self.now:
+            post.comment_count = 0
+        for _ in range(post.comment_count):
+            delay = timedelta(
+                seconds=self.rng.expovariate(1 / COMMENT_DELAY_MEAN)
+            )
+            yield Comments(
+                post_id=post.pk,
+                author_id=self.rng.choice(user_ids),
+                text=self.text(3, 30),
+                created_at=min(post.pub_date + delay, self.now),
+            )
@@ -0,0 +1,49 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.cache import invalidate_post_cards
+from blog.images import generate_variants
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Создаёт уменьшенные копии и WebP для уже загруженных Post.image.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Пересоздать уже существующие копии.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=settings.BLOG_IMAGE_WORKERS
+        )
+
+    def handle(self, *args, **options):
+        images = Post.objects.exclude(image='').values_list(
+            'pk', 'image'
+        ).iterator(chunk_size=1000)
+        # Очередь ограничена, чтобы не держать в памяти задачи на все посты.
+        chunk_size = options['workers'] * 50
+        done = failed = 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            while chunk := list(islice(images, chunk_size)):
+                futures = {
+                    pool.submit(generate_variants, name, options['force']): pk
+                    for pk, name in chunk
+                }
+                for future in as_completed(futures):
+                    if future.exception() is not None:
+                        failed += 1
+                        self.stderr.write(
+                            f'Пост {futures[future]}: {future.exception()}'
+                        )
+                        continue
+                    done += 1
+                    invalidate_post_cards([futures[future]])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано изображений: {done}, с ошибками: {failed}.'
+        ))
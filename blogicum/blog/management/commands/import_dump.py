@@ -0,0 +1,63 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.importing import DumpImporter, iter_json_objects
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково загружает дамп dumpdata (JSON или JSON Lines) пачками '
+        'bulk_create вместо loaddata. Уже существующие id пропускаются, '
+        'поэтому прерванную загрузку можно повторить.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл дампа или - для stdin.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--progress-every', type=int, default=10000,
+            help='Печатать прогресс каждые N загруженных строк.'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должно быть больше нуля.')
+
+        started = time.perf_counter()
+        reported = [0]
+
+        def progress(stats):
+            if stats['rows'] - reported[0] < options['progress_every']:
+                return
+            reported[0] = stats['rows']
+            self.stdout.write(self.rate_line(stats, started))
+
+        importer = DumpImporter(options['batch_size'], on_progress=progress)
+        try:
+            if options['path'] == '-':
+                stats = importer.run(iter_json_objects(sys.stdin))
+            else:
+                with open(options['path'], encoding='utf-8') as file:
+                    stats = importer.run(iter_json_objects(file))
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+
+        self.stdout.write(self.rate_line(stats, started))
+        for label, model_rows in sorted(stats.items()):
+            if '.' in label:
+                self.stdout.write(f'    {label}: {model_rows}')
+        self.stdout.write(
+            'Уже были: {existing}, пропущено моделей: {skipped}, '
+            'отложено: {deferred}, ошибок: {errors}.'.format_map(stats)
+        )
+        for error in importer.errors:
+            self.stdout.write(f'    {error}')
+
+    @staticmethod
+    def rate_line(stats, started):
+        elapsed = time.perf_counter() - started
+        return 'Загружено {} строк за {:.1f} с ({:.0f} строк/с).'.format(
+            stats['rows'], elapsed, stats['rows'] / elapsed if elapsed else 0
+        )
@@ -0,0 +1,203 @@
+import json
+import random
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import got_request_exception
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.benchmarking import get_sample_kwargs, session_headers, wsgi_request
+from blog.profiling import percentile
+
+# Значения SQLite и модуля sqlite3 по умолчанию (timeout=5 с).
+SQLITE_DEFAULTS = {
+    'journal_mode': 'delete',
+    'synchronous': 'full',
+    'busy_timeout': 5000,
+    'mmap_size': 0,
+    'cache_size': -2000,
+}
+
+# Имя -> (ключи DATABASES['default'], BLOG_SQLITE_PRAGMAS).
+# 'current' — BLOG_SQLITE_PRAGMAS и DATABASES как есть.
+CONFIGURATIONS = {
+    'current': (None, None),
+    'defaults': ({'CONN_MAX_AGE': 0}, SQLITE_DEFAULTS),
+    'persistent': ({'CONN_MAX_AGE': 600}, SQLITE_DEFAULTS),
+    'wal': (
+        {'CONN_MAX_AGE': 600},
+        {**SQLITE_DEFAULTS, 'journal_mode': 'wal', 'synchronous': 'normal'},
+    ),
+    'wal-mmap': (
+        {'CONN_MAX_AGE': 600},
+        {
+            **SQLITE_DEFAULTS,
+            'journal_mode': 'wal',
+            'synchronous': 'normal',
+            'mmap_size': 256 * 1024 * 1024,
+            'cache_size': -64 * 1024,
+        },
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест базы: параллельные чтения ленты и записи '
+        'комментариев через WSGI при разных настройках соединений и '
+        'PRAGMA SQLite. Записи остаются в базе — запускайте на копии.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument(
+            '--requests', type=int, default=400,
+            help='Запросов на одну конфигурацию.'
+        )
+        parser.add_argument(
+            '--write-share', type=float, default=0.1,
+            help='Доля запросов, добавляющих комментарий.'
+        )
+        parser.add_argument(
+            '--configs', nargs='+', choices=CONFIGURATIONS,
+            default=list(CONFIGURATIONS),
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Файл для JSON-результатов.')
+
+    def handle(self, *args, **options):
+        author, kwargs = get_sample_kwargs()
+        self.headers = session_headers(author)
+        self.comment_url = f"/posts/{kwargs['pk']}/comment/"
+
+        database = connections.databases[DEFAULT_DB_ALIAS]
+        original = dict(database)
+        results = {}
+        try:
+            for name in options['configs']:
+                connection_settings, pragmas = CONFIGURATIONS[name]
+                database.update(connection_settings or {})
+                # Все записи идут от одного автора — лимит их бы отсёк.
+                with override_settings(
+                    DEBUG=False,
+                    BLOG_RATE_LIMITS={},
+                    BLOG_SQLITE_PRAGMAS=(
+                        settings.BLOG_SQLITE_PRAGMAS if pragmas is None
+                        else pragmas
+                    ),
+                ):
+                    # Новые PRAGMA и CONN_MAX_AGE — с новыми соединениями.
+                    # journal_mode меняется здесь, пока других соединений
+                    # нет: из WAL SQLite не выйдет, если файл открыт ещё
+                    # кем-то, и потоки мешали бы друг другу.
+                    connections.close_all()
+                    connections[DEFAULT_DB_ALIAS].ensure_connection()
+                    results[name] = self.run_configuration(options)
+                self.report(name, results[name])
+                database.clear()
+                database.update(original)
+        finally:
+            database.clear()
+            database.update(original)
+            connections.close_all()
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump({
+                    'created_at': timezone.now().isoformat(),
+                    'vendor': connections[DEFAULT_DB_ALIAS].vendor,
+                    'threads': options['threads'],
+                    'requests': options['requests'],
+                    'write_share': options['write_share'],
+                    'configs': results,
+                }, file, ensure_ascii=False, indent=2)
+
+    def run_configuration(self, options):
+        application = WSGIHandler()
+        threads = options['threads']
+        if threads < 1:
+            raise CommandError('--threads должно быть больше нуля.')
+        errors = Counter()
+
+        def count_error(sender, request, **kwargs):
+            errors[str(kwargs.get('exception', 'unknown'))] += 1
+
+        def worker(number):
+            generator = random.Random(options['seed'] * 1000 + number)
+            timings = {'read': [], 'write': []}
+            statuses = Counter()
+            try:
+                for _ in range(number, options['requests'], threads):
+                    kind = (
+                        'write'
+                        if generator.random() < options['write_share']
+                        else 'read'
+                    )
+                    started = time.perf_counter()
+                    if kind == 'write':
+                        body = urlencode({'text': 'Нагрузочный тест'})
+                        status = wsgi_request(
+                            application,
+                            self.comment_url,
+                            method='POST',
+                            body=body.encode(),
+                            CONTENT_TYPE='application/x-www-form-urlencoded',
+                            **self.headers
+                        )
+                    else:
+                        status = wsgi_request(application, '/', **self.headers)
+                    timings[kind].append(
+                        (time.perf_counter() - started) * 1000
+                    )
+                    statuses[status] += 1
+            finally:
+                connections.close_all()
+            return timings, statuses
+
+        got_request_exception.connect(count_error)
+        started = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(threads) as executor:
+                runs = list(executor.map(worker, range(threads)))
+        finally:
+            got_request_exception.disconnect(count_error)
+        elapsed = time.perf_counter() - started
+
+        reads = [ms for timings, _ in runs for ms in timings['read']]
+        writes = [ms for timings, _ in runs for ms in timings['write']]
+        statuses = sum((statuses for _, statuses in runs), Counter())
+        return {
+            'rps': round((len(reads) + len(writes)) / elapsed, 1),
+            'reads': len(reads),
+            'writes': len(writes),
+            'read_p50_ms': round(percentile(reads, 0.5), 3),
+            'read_p99_ms': round(percentile(reads, 0.99), 3),
+            'write_p50_ms': round(percentile(writes, 0.5), 3),
+            'write_p99_ms': round(percentile(writes, 0.99), 3),
+            'statuses': {str(code): count for code, count in statuses.items()},
+            'errors': dict(errors),
+            'lock_errors': sum(
+                count for error, count in errors.items() if 'locked' in error
+            ),
+        }
+
+    def report(self, name, result):
+        self.stdout.write(
+            '{name:<11} {rps:>8.1f} req/s '
+            'read p50={read_p50_ms:.2f}ms p99={read_p99_ms:.2f}ms '
+            'write p50={write_p50_ms:.2f}ms p99={write_p99_ms:.2f}ms '
+            'errors={error_count} locked={lock_errors}'.format(
+                name=name,
+                error_count=sum(result['errors'].values()),
+                **result
+            )
+        )
+        for error, count in result['errors'].items():
+            self.stdout.write(f'    {count} × {error}')
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from blog.scheduler import publish_due_posts, run_scheduler
+
+
+class Command(BaseCommand):
+    help = 'Открывает отложенные публикации, у которых наступил pub_date.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Один проход без ожидания следующих публикаций.'
+        )
+        parser.add_argument(
+            '--max-interval', type=float, default=60,
+            help='Наибольшая пауза между проверками, секунд.'
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            published = publish_due_posts()
+            self.stdout.write(
+                self.style.SUCCESS(f'Опубликовано постов: {published}.')
+            )
+            return
+
+        try:
+            run_scheduler(max_interval=options['max_interval'])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from blog.search import Fts5Index, get_index, reindex_posts
+
+
+class Command(BaseCommand):
+    help = 'Полностью перестраивает поисковый индекс постов.'
+
+    def handle(self, *args, **options):
+        index = get_index()
+        if not isinstance(index, Fts5Index):
+            self.stdout.write(
+                'FTS5 недоступен: индекс в памяти строится при первом поиске.'
+            )
+            return
+
+        index.clear()
+        reindex_posts(Post.objects.all())
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано постов: {Post.objects.count()}.'
+        ))
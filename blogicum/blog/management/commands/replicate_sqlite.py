@@ -0,0 +1,50 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def copy_database(source, path):
+    """Согласованный снимок основной базы в файл реплики (backup API)."""
+    source.ensure_connection()
+    target = sqlite3.connect(str(path))
+    try:
+        source.connection.backup(target)
+    finally:
+        target.close()
+
+
+class Command(BaseCommand):
+    help = (
+        'Заменитель репликации для локальной проверки: копирует основную '
+        'базу SQLite в файлы реплик из BLOG_READ_REPLICAS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Повторять каждые N секунд; 0 — скопировать один раз.'
+        )
+
+    def handle(self, *args, **options):
+        source = connections[DEFAULT_DB_ALIAS]
+        replicas = settings.BLOG_READ_REPLICAS
+        if source.vendor != 'sqlite' or not replicas:
+            raise CommandError(
+                'Нужна основная база SQLite и хотя бы одна реплика '
+                '(SQLITE_REPLICAS в settings.py).'
+            )
+
+        while True:
+            started = time.perf_counter()
+            for alias in replicas:
+                copy_database(source, connections[alias].settings_dict['NAME'])
+            self.stdout.write(
+                f'Реплик обновлено: {len(replicas)} за '
+                f'{time.perf_counter() - started:.2f} с.'
+            )
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from blog.benchmarking import batched
+from blog.models import Post
+from blog.ranking import RANKING_BATCH_SIZE, rank_posts, stale_post_ids
+
+
+class Command(BaseCommand):
+    help = (
+        'Досчитывает популярность постов, пропущенных сигналами: без счёта '
+        'или с комментариями новее счёта. --full пересчитывает все посты.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Пересчитать все посты (после смены BLOG_HOT_*).'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=RANKING_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        post_ids = (
+            Post.objects.order_by().values_list('pk', flat=True)
+            if options['full'] else stale_post_ids()
+        )
+        ranked = 0
+        # Список id целиком: SQLite не изолирует открытый курсор от записей
+        # в PostRanking, которые делает тот же цикл.
+        for batch in batched(list(post_ids), options['batch_size']):
+            ranked += rank_posts(batch)
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано постов: {ranked}.'
+        ))
@@ -0,0 +1,168 @@
+import asyncio
+import json
+import logging
+import random
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+
+from blog.profiling import collect_stats, view_metrics
+from blog.routers import choose_replica, read_from
+from blog.staticfiles import StaticFileIndex
+
+logger = logging.getLogger('blog.performance')
+
+
+class StaticFilesMiddleware:
+    """Отдаёт собранную collectstatic статику до остальных middleware:
+    без сессий, пользователя и замеров, предварительно сжатые копии — по
+    Accept-Encoding. Файлы отдаёт wsgi.file_wrapper (sendfile сервера).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.BLOG_STATIC_SERVE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+        self.index = StaticFileIndex(
+            settings.STATIC_ROOT,
+            settings.STATIC_URL,
+            settings.BLOG_STATIC_MAX_AGE,
+            getattr(staticfiles_storage, 'hashed_files', {}).values(),
+        )
+
+    def static_response(self, request):
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        return self.index.response(request)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        return self.static_response(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        return (
+            self.static_response(request)
+            or await self.get_response(request)
+        )
+
+
+class PerformanceMiddleware:
+    """Замеры запроса: Server-Timing, строка лога и гистограммы по view."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Признак, по которому Django узнаёт асинхронный middleware.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def is_sampled(self):
+        sample_rate = settings.BLOG_PERF_SAMPLE_RATE
+        return bool(sample_rate) and random.random() < sample_rate
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.is_sampled():
+            return self.get_response(request)
+
+        with collect_stats() as stats:
+            response = self.get_response(request)
+        return self.record(request, response, stats)
+
+    async def __acall__(self, request):
+        if not self.is_sampled():
+            return await self.get_response(request)
+
+        # Запросы и шаблоны выполняются в потоке запроса (sync_to_async),
+        # поэтому и сбор статистики включается в нём.
+        context = collect_stats()
+        stats = await sync_to_async(context.__enter__)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(context.__exit__)(None, None, None)
+        return self.record(request, response, stats)
+
+    def record(self, request, response, stats):
+        match = request.resolver_match
+        view_name = match.view_name if match else 'unresolved'
+        view_metrics.observe(view_name, stats)
+
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={stats.sql_time * 1000:.2f};desc="{stats.queries} SQL"',
+            f'tpl;dur={stats.render_time * 1000:.2f}',
+            f'total;dur={stats.total_time * 1000:.2f}',
+        ))
+        logger.info(json.dumps({
+            'view': view_name,
+            'method': request.method,
+            'status': response.status_code,
+            'queries': stats.queries,
+            'sql_ms': round(stats.sql_time * 1000, 3),
+            'render_ms': round(stats.render_time * 1000, 3),
+            'total_ms': round(stats.total_time * 1000, 3),
+        }))
+        return response
+
+
+class ReplicaMiddleware:
+    """GET/HEAD читают с реплики; после записи посетитель на время
+    BLOG_REPLICA_PIN_SECONDS закрепляется за основной базой, чтобы сразу
+    увидеть свой комментарий или правку, даже если реплика отстаёт.
+    """
+
+    sync_capable = True
+    async_capable = True
+    pin_cookie = 'primary_pin'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def read_alias(self, request):
+        if (
+            request.method not in ('GET', 'HEAD')
+            or self.pin_cookie in request.COOKIES
+        ):
+            return None
+        return choose_replica()
+
+    def pin(self, request, response):
+        if request.method not in ('GET', 'HEAD', 'OPTIONS') and (
+            settings.BLOG_READ_REPLICAS
+        ):
+            response.set_cookie(
+                self.pin_cookie,
+                '1',
+                max_age=settings.BLOG_REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        with read_from(self.read_alias(request)):
+            response = self.get_response(request)
+        return self.pin(request, response)
+
+    async def __acall__(self, request):
+        with read_from(self.read_alias(request)):
+            response = await self.get_response(request)
+        return self.pin(request, response)
@@ -0,0 +1,46 @@
+from django.db import OperationalError, migrations
+
+FTS_TABLE = 'blog_post_fts'
+
+
+def create_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5('
+            'title, text, category, location, '
+            "tokenize = 'unicode61 remove_diacritics 0')"
+        )
+    except OperationalError:
+        # SQLite собран без FTS5 — поиск работает через индекс в памяти.
+        return
+
+    from blog.search import post_document
+
+    Post = apps.get_model('blog', 'Post')
+    posts = Post.objects.select_related('category', 'location')
+    with schema_editor.connection.cursor() as cursor:
+        for post in posts.iterator(chunk_size=2000):
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} '
+                '(rowid, title, text, category, location) '
+                'VALUES (%s, %s, %s, %s, %s)',
+                (post.pk, *post_document(post))
+            )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_post_is_visible'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
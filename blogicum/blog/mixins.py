@@ -2,15 +2,36 @@ from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse_lazy
 
 from blog.models import Post
+from blog.service import get_post_list
 
 
-class PostMixin:
+class PostLoaderMixin:
+    """Один запрос за пост: сам пост, автор и признак видимости.
 
-    def get_object(self):
-        return get_object_or_404(Post, pk=self.kwargs[self.pk_url_kwarg])
+    Результат хранится на экземпляре представления, поэтому повторные
+    вызовы get_object() в dispatch/get/post не обращаются к базе. Пост,
+    уже загруженный для проверки ETag (blog.conditional), не читается
+    повторно.
+    """
+
+    pk_url_kwarg = 'pk'
+
+    def get_object(self, queryset=None):
+        loaded = getattr(self.request, 'loaded_post', None)
+        if loaded is not None and loaded.pk == self.kwargs[self.pk_url_kwarg]:
+            self._post = loaded
+        if getattr(self, '_post', None) is None:
+            self._post = get_object_or_404(
+                get_post_list(),
+                pk=self.kwargs[self.pk_url_kwarg]
+            )
+        return self._post
+
+
+class PostMixin(PostLoaderMixin):
 
     def dispatch(self, request, *args, **kwargs):
-        if self.get_object().author != request.user:
+        if self.get_object().author_id != request.user.id:
             return redirect('blog:post_detail', pk=kwargs['pk'])
 
         return super().dispatch(request, *args, **kwargs)
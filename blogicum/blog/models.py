@@ -103,12 +103,51 @@ class Post(BaseModelIsPublished):
         upload_to='birthdays_images',
         blank=True
     )
+    # Материализованная видимость в лентах: опубликован, категория
+    # опубликована и pub_date наступил. Поддерживается blog.scheduler.
+    is_visible = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Виден в лентах'
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев'
+    )
+    # Последнее изменение того, что видно на странице поста: правки,
+    # комментарии, публикация по расписанию, правки категории,
+    # местоположения и автора. По нему считаются ETag и Last-Modified.
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
 
     class Meta:
         ordering = ("-pub_date",)
         verbose_name = 'Публикация'
         verbose_name_plural = 'Публикации'
         default_related_name = 'posts'
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                condition=models.Q(is_visible=True),
+                name='post_visible_pub_date_idx',
+            ),
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(is_visible=False, is_published=True),
+                name='post_scheduled_pub_date_idx',
+            ),
+            models.Index(
+                fields=('category', '-pub_date', '-id'),
+                name='post_category_pub_date_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_pub_date_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title[:TITLE_CUT]
@@ -134,6 +173,39 @@ class Comments(models.Model):
         ordering = ('created_at',)
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_at_idx',
+            ),
+        )
 
     def __str__(self):
         return (f'Комментарий к посту: {self.post}. Автор - {self.author}')
+
+
+class PostRanking(models.Model):
+    """Материализованная популярность поста для ленты «Популярное».
+
+    score — log2 суммы весов активности (blog.ranking); поддерживается
+    сигналами комментариев и постов и командой update_post_ranking.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='ranking',
+    )
+    score = models.FloatField('Популярность')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Популярность поста'
+        verbose_name_plural = 'Популярность постов'
+        indexes = (
+            models.Index(
+                fields=('-score', '-post'),
+                name='post_ranking_score_idx',
+            ),
+        )
@@ -0,0 +1,126 @@
+import base64
+import binascii
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+FORWARD = 'n'
+BACKWARD = 'p'
+
+
+def encode_cursor(direction, value, pk):
+    raw = f'{direction}|{value.isoformat()}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Вернуть (direction, value, pk) или None для битого курсора."""
+    try:
+        raw = base64.urlsafe_b64decode(
+            token + '=' * (-len(token) % 4)
+        ).decode()
+        direction, value, pk = raw.split('|')
+        value = parse_datetime(value)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if direction not in (FORWARD, BACKWARD) or value is None:
+        return None
+    return direction, value, pk
+
+
+class CursorPage:
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset-пагинация по (поле даты, id) без COUNT(*) и OFFSET.
+
+    ordering — поле даты, с '-' для убывающего порядка: '-pub_date' для
+    лент, 'created_at' для комментариев.
+    """
+
+    def __init__(self, object_list, per_page, ordering='-pub_date'):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.descending = ordering.startswith('-')
+        self.field = ordering.lstrip('-')
+
+    def _after(self, value, pk, forward):
+        lookup = 'lt' if self.descending == forward else 'gt'
+        return (
+            Q(**{f'{self.field}__{lookup}': value})
+            | Q(**{self.field: value, f'pk__{lookup}': pk})
+        )
+
+    def _ordering(self, forward):
+        prefix = '-' if self.descending == forward else ''
+        return f'{prefix}{self.field}', f'{prefix}pk'
+
+    def get_page(self, cursor=None):
+        decoded = decode_cursor(cursor) if cursor else None
+        if decoded is None:
+            return self._forward_page(self.object_list, has_previous=False)
+
+        direction, value, pk = decoded
+        if direction == FORWARD:
+            return self._forward_page(
+                self.object_list.filter(self._after(value, pk, True)),
+                has_previous=True
+            )
+        return self._backward_page(
+            self.object_list.filter(self._after(value, pk, False))
+        )
+
+    def _forward_page(self, queryset, has_previous):
+        rows = list(
+            queryset.order_by(*self._ordering(True))[:self.per_page + 1]
+        )
+        has_next = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        return self._make_page(rows, has_next, has_previous and bool(rows))
+
+    def _backward_page(self, queryset):
+        rows = list(
+            queryset.order_by(*self._ordering(False))[:self.per_page + 1]
+        )
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page][::-1]
+        if not rows:
+            return self.get_page()
+        return self._make_page(rows, True, has_previous)
+
+    def _make_page(self, rows, has_next, has_previous):
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = encode_cursor(
+                FORWARD, getattr(rows[-1], self.field), rows[-1].pk
+            )
+        if rows and has_previous:
+            previous_cursor = encode_cursor(
+                BACKWARD, getattr(rows[0], self.field), rows[0].pk
+            )
+        return CursorPage(rows, next_cursor, previous_cursor)
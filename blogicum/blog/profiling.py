@@ -0,0 +1,167 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from django.db import connections
+from django.template.base import Template
+
+_local = threading.local()
+_install_lock = threading.Lock()
+_original_render = None
+
+
+class RequestStats:
+    __slots__ = ('queries', 'sql_time', 'render_time', 'total_time')
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.render_time = 0.0
+        self.total_time = 0.0
+
+
+def _active_stats():
+    return getattr(_local, 'stack', None)
+
+
+def _timed_render(self, context):
+    stack = _active_stats()
+    if not stack or getattr(_local, 'rendering', False):
+        return _original_render(self, context)
+
+    # Вложенные include учитываются во внешнем шаблоне.
+    _local.rendering = True
+    started = time.perf_counter()
+    try:
+        return _original_render(self, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        for stats in stack:
+            stats.render_time += elapsed
+        _local.rendering = False
+
+
+def install_template_timer():
+    global _original_render
+    with _install_lock:
+        if _original_render is None:
+            _original_render = Template.render
+            Template.render = _timed_render
+
+
+def _query_timer(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        for stats in _active_stats() or ():
+            stats.queries += 1
+            stats.sql_time += elapsed
+
+
+@contextmanager
+def collect_stats():
+    """Собирает число и время SQL-запросов и время рендеринга шаблонов."""
+    install_template_timer()
+    stats = RequestStats()
+    stack = _local.stack = getattr(_local, 'stack', None) or []
+    stack.append(stats)
+    started = time.perf_counter()
+    try:
+        if len(stack) == 1:
+            with _execute_wrappers():
+                yield stats
+        else:
+            yield stats
+    finally:
+        stats.total_time = time.perf_counter() - started
+        stack.pop()
+
+
+@contextmanager
+def _execute_wrappers():
+    wrappers = [
+        connection.execute_wrapper(_query_timer)
+        for connection in connections.all()
+    ]
+    for wrapper in wrappers:
+        wrapper.__enter__()
+    try:
+        yield
+    finally:
+        for wrapper in reversed(wrappers):
+            wrapper.__exit__(None, None, None)
+
+
+def percentile(values, share):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, round(share * len(values)) - 1))
+    return values[index]
+
+
+class Histogram:
+    """Гистограмма длительностей с фиксированными границами корзин, мс."""
+
+    BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, float('inf'))
+
+    def __init__(self):
+        self.counts = [0] * len(self.BUCKETS)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.BUCKETS):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        self.count += 1
+        self.total += value
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'sum': round(self.total, 3),
+            'buckets': {
+                ('+Inf' if bound == float('inf') else str(bound)): count
+                for bound, count in zip(self.BUCKETS, self.counts)
+            },
+        }
+
+
+class ViewMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def observe(self, view_name, stats):
+        with self._lock:
+            histograms = self._views.setdefault(view_name, {
+                'total_ms': Histogram(),
+                'sql_ms': Histogram(),
+                'render_ms': Histogram(),
+                'queries': Histogram(),
+            })
+            histograms['total_ms'].observe(stats.total_time * 1000)
+            histograms['sql_ms'].observe(stats.sql_time * 1000)
+            histograms['render_ms'].observe(stats.render_time * 1000)
+            histograms['queries'].observe(stats.queries)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                view_name: {
+                    metric: histogram.as_dict()
+                    for metric, histogram in histograms.items()
+                }
+                for view_name, histograms in self._views.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+view_metrics = ViewMetrics()
@@ -0,0 +1,125 @@
+"""Лента «Популярное»: посты по затухающей активности.
+
+Событие — публикация поста или комментарий — весит 2 ** ((t - EPOCH) / H),
+где H — BLOG_HOT_HALF_LIFE_HOURS: через H часов новое событие весит вдвое
+больше. Затухание одинаково для всех постов, поэтому порядок по сумме
+весов совпадает с порядком по затухшему счёту в любой момент, и старые
+счета со временем пересчитывать не нужно: комментарий лишь прибавляет
+свой вес к счёту одного поста. PostRanking.score хранит log2 суммы, чтобы
+не переполнить float. Смена H требует update_post_ranking --full.
+"""
+import math
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from blog.models import Comments, Post, PostRanking
+from blog.service import filter_post_list, get_post_list
+
+EPOCH = datetime(2020, 1, 1, tzinfo=dt_timezone.utc)
+RANKING_BATCH_SIZE = 1000
+
+
+def event_score(moment):
+    """log2 веса события в момент moment."""
+    half_life = settings.BLOG_HOT_HALF_LIFE_HOURS * 3600
+    return (moment - EPOCH).total_seconds() / half_life
+
+
+def window_step(moment):
+    """Номер периода полураспада, в котором лежит moment: нижняя граница
+    «Популярного» сдвигается по этим шагам, а не непрерывно, поэтому состав
+    ленты без записей меняется только на их границах.
+    """
+    return math.floor(event_score(moment))
+
+
+def window_step_start(step):
+    return EPOCH + timedelta(hours=step * settings.BLOG_HOT_HALF_LIFE_HOURS)
+
+
+def add_scores(first, second):
+    """log2(2 ** first + 2 ** second) без переполнения."""
+    if first is None:
+        return second
+    high, low = max(first, second), min(first, second)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+def rank_posts(post_ids):
+    """Пересчитывает счёт постов по их публикации и комментариям."""
+    post_ids = list(post_ids)
+    scores = {
+        pk: event_score(pub_date)
+        for pk, pub_date in Post.objects.filter(
+            pk__in=post_ids
+        ).values_list('pk', 'pub_date')
+    }
+    for post_id, created_at in Comments.objects.filter(
+        post_id__in=scores
+    ).order_by().values_list('post_id', 'created_at'):
+        scores[post_id] = add_scores(scores[post_id], event_score(created_at))
+
+    rankings = [
+        PostRanking(post_id=post_id, score=score)
+        for post_id, score in scores.items()
+    ]
+    with transaction.atomic():
+        existing = set(PostRanking.objects.filter(
+            post_id__in=scores
+        ).values_list('post_id', flat=True))
+        created, updated = [], []
+        for ranking in rankings:
+            if ranking.post_id in existing:
+                # bulk_update не заполняет auto_now.
+                ranking.updated_at = timezone.now()
+                updated.append(ranking)
+            else:
+                created.append(ranking)
+        PostRanking.objects.bulk_create(created)
+        PostRanking.objects.bulk_update(updated, ('score', 'updated_at'))
+    return len(rankings)
+
+
+def add_activity(post_id, moment):
+    """Прибавляет к счёту поста одно событие — без чтения комментариев."""
+    with transaction.atomic():
+        ranking = PostRanking.objects.select_for_update().filter(
+            post_id=post_id
+        ).first()
+        if ranking is None:
+            rank_posts([post_id])
+            return
+        ranking.score = add_scores(ranking.score, event_score(moment))
+        ranking.save(update_fields=('score', 'updated_at'))
+
+
+def stale_post_ids():
+    """Посты без счёта или с комментариями новее своего счёта — например,
+    после bulk_create в обход сигналов.
+    """
+    unranked = Post.objects.filter(ranking__isnull=True)
+    outdated = Comments.objects.filter(
+        created_at__gt=F('post__ranking__updated_at')
+    )
+    return unranked.order_by().values_list('pk', flat=True).union(
+        outdated.order_by().values_list('post_id', flat=True)
+    )
+
+
+def popular_post_list():
+    """Видимые посты по убыванию счёта; посты, чья активность к началу
+    текущего периода полураспада затухла сильнее чем в
+    2 ** BLOG_HOT_WINDOW_HALF_LIVES раз, не попадают.
+    """
+    floor = (
+        window_step(timezone.now()) - settings.BLOG_HOT_WINDOW_HALF_LIVES
+    )
+    # ranking__post_id, а не pk: тогда порядок целиком даёт индекс счёта.
+    return filter_post_list(get_post_list()).filter(
+        ranking__score__gte=floor
+    ).order_by('-ranking__score', '-ranking__post_id')
@@ -0,0 +1,172 @@
+"""Ограничение частоты записей: корзины токенов на пользователя и на IP.
+
+Лимит 'N/период' (s, m, h, d) — корзина на N токенов, которая
+наполняется со скоростью N за период; запрос берёт токен из корзины
+пользователя (если он вошёл) и из корзины его IP. Пустая корзина — ответ
+429 с Retry-After. Лимиты — в BLOG_RATE_LIMITS по имени: строка для обеих
+корзин или {'user': ..., 'ip': ...}. Хранилище корзин —
+BLOG_RATE_LIMIT_BACKEND: 'memory' (в процессе), 'cache' (кеш Django, общий
+для процессов при Redis/Memcached) или путь к своему классу с методом
+take(key, rate, capacity).
+"""
+import math
+import time
+from functools import lru_cache, wraps
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.shortcuts import render
+from django.utils.module_loading import import_string
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+BACKENDS = {
+    'memory': 'blog.ratelimit.MemoryBackend',
+    'cache': 'blog.ratelimit.CacheBackend',
+}
+
+
+@lru_cache(maxsize=None)
+def parse_rate(value):
+    """'10/m' -> (токенов в секунду, ёмкость корзины)."""
+    count, _, period = value.partition('/')
+    try:
+        capacity = int(count)
+        seconds = PERIODS[period]
+    except (KeyError, ValueError):
+        raise ValueError(f'Неверный лимит {value!r}: ожидается N/s|m|h|d.')
+    return capacity / seconds, capacity
+
+
+def take_token(state, now, rate, capacity):
+    """(новое состояние, сколько ждать до токена; 0 — токен выдан).
+
+    Состояние — (токены, время); None — полная корзина.
+    """
+    tokens, updated = state or (capacity, now)
+    tokens = min(capacity, tokens + (now - updated) * rate)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) / rate
+
+
+class MemoryBackend:
+    """Корзины в памяти процесса; полные корзины периодически удаляются."""
+
+    max_keys = 10000
+
+    def __init__(self):
+        self._lock = Lock()
+        self._buckets = {}
+
+    def take(self, key, rate, capacity):
+        now = time.monotonic()
+        with self._lock:
+            state, _ = self._buckets.get(key, (None, None))
+            state, wait = take_token(state, now, rate, capacity)
+            tokens, _ = state
+            # Момент, когда корзина снова полна и запись можно забыть.
+            self._buckets[key] = (state, now + (capacity - tokens) / rate)
+            if len(self._buckets) > self.max_keys:
+                self._buckets = {
+                    key: bucket for key, bucket in self._buckets.items()
+                    if bucket[1] > now
+                }
+        return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheBackend:
+    """Корзины в кеше BLOG_RATE_LIMIT_CACHE.
+
+    Чтение и запись не атомарны: одновременные запросы одного ключа в
+    разных процессах могут взять на токен-другой больше лимита.
+    """
+
+    def take(self, key, rate, capacity):
+        cache = caches[settings.BLOG_RATE_LIMIT_CACHE]
+        key = f'ratelimit:{key}'
+        state, wait = take_token(cache.get(key), time.time(), rate, capacity)
+        # Через столько секунд корзина снова полна — как без записи.
+        cache.set(key, state, math.ceil(capacity / rate))
+        return wait
+
+
+_backends = {}
+
+
+def get_backend():
+    path = settings.BLOG_RATE_LIMIT_BACKEND
+    path = BACKENDS.get(path, path)
+    if path not in _backends:
+        _backends[path] = import_string(path)()
+    return _backends[path]
+
+
+def client_ip(request):
+    """Адрес клиента: за BLOG_RATE_LIMIT_PROXY_HOPS доверенными прокси —
+    столько-то записей с конца BLOG_RATE_LIMIT_IP_HEADER.
+
+    Каждый прокси дописывает адрес, от которого получил запрос, в конец
+    X-Forwarded-For; левые записи присылает сам клиент, и верить им
+    нельзя — иначе каждый запрос получал бы новую корзину.
+    """
+    header = settings.BLOG_RATE_LIMIT_IP_HEADER
+    hops = settings.BLOG_RATE_LIMIT_PROXY_HOPS
+    value = request.META.get(header) if header else None
+    if value:
+        entries = [entry.strip() for entry in value.split(',')]
+        if len(entries) >= hops:
+            return entries[-hops]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def check_rate(request, name):
+    """Секунды до следующей разрешённой попытки; 0 — запрос разрешён."""
+    limits = settings.BLOG_RATE_LIMITS.get(name) or {}
+    if isinstance(limits, str):
+        limits = {'user': limits, 'ip': limits}
+    identities = {'ip': client_ip(request)}
+    if request.user.is_authenticated:
+        identities['user'] = request.user.pk
+
+    backend = get_backend()
+    return max(
+        (
+            backend.take(f'{name}:{kind}:{identity}', *parse_rate(limit))
+            for kind, identity in identities.items()
+            if (limit := limits.get(kind))
+        ),
+        default=0
+    )
+
+
+def rate_limited(request, retry_after):
+    response = render(
+        request,
+        'pages/429.html',
+        {'retry_after': math.ceil(retry_after)},
+        status=429
+    )
+    response['Retry-After'] = str(math.ceil(retry_after))
+    return response
+
+
+def rate_limit(name, methods=('POST',)):
+    """Ограничивает view лимитом BLOG_RATE_LIMITS[name] для methods."""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method in methods:
+                retry_after = check_rate(request, name)
+                if retry_after:
+                    return rate_limited(request, retry_after)
+            return view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
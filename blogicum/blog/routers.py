@@ -0,0 +1,53 @@
+"""Чтение с реплик.
+
+Запрос читает с реплики только внутри read_from(), который включает
+ReplicaMiddleware для GET/HEAD без недавней записи от того же посетителя.
+Записи, транзакции, команды и фоновые потоки работают с основной базой.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_read_alias = ContextVar('blog_read_alias', default=None)
+
+
+def choose_replica():
+    replicas = settings.BLOG_READ_REPLICAS
+    return random.choice(replicas) if replicas else None
+
+
+@contextmanager
+def read_from(alias):
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+class ReplicaRouter:
+    # Сессии и прочие служебные таблицы всегда читаются с основной базы.
+    route_app_labels = {'blog', 'auth'}
+
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        if (
+            alias is None
+            or model._meta.app_label not in self.route_app_labels
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return None
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии основной базы, связи между ними допустимы.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db == DEFAULT_DB_ALIAS
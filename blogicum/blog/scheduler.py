@@ -0,0 +1,83 @@
+import threading
+
+from django.core.cache import cache
+from django.dispatch import Signal
+from django.utils import timezone
+
+from blog.models import Post
+
+NEXT_DUE_KEY = 'scheduler:next_due'
+
+# Отправляется после того, как отложенные посты стали видимыми.
+posts_published = Signal()
+
+
+def is_post_visible(post, now=None):
+    now = now or timezone.now()
+    return bool(
+        post.is_published
+        and post.category_id is not None
+        and post.category.is_published
+        and post.pub_date is not None
+        and post.pub_date <= now
+    )
+
+
+def scheduled_posts():
+    return Post.objects.filter(
+        is_visible=False,
+        is_published=True,
+        category__is_published=True,
+    )
+
+
+def get_next_due():
+    """Дата ближайшей отложенной публикации или None; хранится в кеше."""
+    cached = cache.get(NEXT_DUE_KEY)
+    if cached is not None:
+        return cached['next_due']
+
+    next_due = scheduled_posts().order_by(
+        'pub_date'
+    ).values_list('pub_date', flat=True).first()
+    cache.set(NEXT_DUE_KEY, {'next_due': next_due}, None)
+    return next_due
+
+
+def reset_next_due():
+    cache.delete(NEXT_DUE_KEY)
+
+
+def publish_due_posts(now=None):
+    now = now or timezone.now()
+    post_ids = list(
+        scheduled_posts().filter(
+            pub_date__lte=now
+        ).values_list('pk', flat=True)
+    )
+    if post_ids:
+        Post.objects.filter(pk__in=post_ids).update(
+            is_visible=True, updated_at=now
+        )
+        posts_published.send(sender=Post, post_ids=post_ids)
+    reset_next_due()
+    return len(post_ids)
+
+
+def publish_due_posts_if_needed():
+    next_due = get_next_due()
+    if next_due is not None and next_due <= timezone.now():
+        publish_due_posts()
+
+
+def run_scheduler(stop_event=None, max_interval=60):
+    """Публикует посты точно в срок, засыпая до ближайшего pub_date."""
+    stop_event = stop_event or threading.Event()
+    while not stop_event.is_set():
+        publish_due_posts()
+        timeout = max_interval
+        next_due = get_next_due()
+        if next_due is not None:
+            until_due = (next_due - timezone.now()).total_seconds()
+            timeout = min(timeout, max(until_due, 0))
+        stop_event.wait(timeout)
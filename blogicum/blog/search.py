@@ -0,0 +1,234 @@
+"""Полнотекстовый поиск по постам.
+
+Документ поста — стеммированные заголовок, текст, название категории и
+местоположения. Если в SQLite есть FTS5 и таблица blog_post_fts создана
+миграцией, индекс хранится в ней; иначе используется инвертированный
+индекс в памяти процесса, который строится при первом поиске.
+"""
+import math
+import re
+from bisect import bisect_left, insort
+from collections import defaultdict
+from threading import Lock
+
+from django.conf import settings
+from django.db import connection
+
+from blog.models import Post
+from blog.stemmer import stem
+
+FTS_TABLE = 'blog_post_fts'
+FIELDS = ('title', 'text', 'category', 'location')
+FIELD_WEIGHTS = (10.0, 1.0, 3.0, 2.0)
+WORD_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    return [stem(word) for word in WORD_RE.findall(text or '')]
+
+
+def post_document(post):
+    return (
+        ' '.join(tokenize(post.title)),
+        ' '.join(tokenize(post.text)),
+        ' '.join(tokenize(post.category.title if post.category else '')),
+        ' '.join(tokenize(post.location.name if post.location else '')),
+    )
+
+
+def posts_to_index():
+    return Post.objects.select_related('category', 'location').only(
+        'pk', 'title', 'text', 'category__title', 'location__name'
+    )
+
+
+def query_chunks(items, params_per_item):
+    """Части items, параметры которых помещаются в один запрос."""
+    size = connection.features.max_query_params // params_per_item
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class Fts5Index:
+    """Индекс в таблице FTS5.
+
+    Запросы — по одному на пачку, без executemany: его не умеет курсор,
+    обёрнутый панелью SQL debug-toolbar.
+    """
+
+    def add(self, posts):
+        rows = [(post.pk, *post_document(post)) for post in posts]
+        self.remove([row[0] for row in rows])
+        row_sql = f'({", ".join(["%s"] * (len(FIELDS) + 1))})'
+        with connection.cursor() as cursor:
+            for chunk in query_chunks(rows, len(FIELDS) + 1):
+                cursor.execute(
+                    f'INSERT INTO {FTS_TABLE} (rowid, {", ".join(FIELDS)}) '
+                    f'VALUES {", ".join([row_sql] * len(chunk))}',
+                    [value for row in chunk for value in row]
+                )
+
+    def remove(self, post_ids):
+        post_ids = list(post_ids)
+        with connection.cursor() as cursor:
+            for chunk in query_chunks(post_ids, 1):
+                cursor.execute(
+                    f'DELETE FROM {FTS_TABLE} WHERE rowid IN '
+                    f'({", ".join(["%s"] * len(chunk))})',
+                    chunk
+                )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+
+    def search(self, terms, limit):
+        match = ' AND '.join(f'"{term}"*' for term in terms)
+        weights = ', '.join(str(weight) for weight in FIELD_WEIGHTS)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s',
+                [match, limit]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class PythonIndex:
+    """Инвертированный индекс в памяти: терм -> {id поста: веса полей}."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._built = False
+        self._postings = defaultdict(dict)
+        self._terms = []
+        self._documents = {}
+
+    def _add_one(self, post_id, document):
+        self._remove_one(post_id)
+        terms = {}
+        for field_index, field_text in enumerate(document):
+            for term in field_text.split():
+                weights = terms.setdefault(term, [0] * len(FIELDS))
+                weights[field_index] += 1
+        for term, weights in terms.items():
+            if term not in self._postings:
+                insort(self._terms, term)
+            self._postings[term][post_id] = weights
+        self._documents[post_id] = list(terms)
+
+    def _remove_one(self, post_id):
+        for term in self._documents.pop(post_id, ()):
+            postings = self._postings[term]
+            postings.pop(post_id, None)
+            if not postings:
+                del self._postings[term]
+                del self._terms[bisect_left(self._terms, term)]
+
+    def _ensure_built(self):
+        if not self._built:
+            for post in posts_to_index().iterator(chunk_size=2000):
+                self._add_one(post.pk, post_document(post))
+            self._built = True
+
+    def add(self, posts):
+        with self._lock:
+            if self._built:
+                for post in posts:
+                    self._add_one(post.pk, post_document(post))
+
+    def remove(self, post_ids):
+        with self._lock:
+            for post_id in post_ids:
+                self._remove_one(post_id)
+
+    def clear(self):
+        with self._lock:
+            self.__init__()
+
+    def _expand(self, prefix):
+        index = bisect_left(self._terms, prefix)
+        while (
+            index < len(self._terms)
+            and self._terms[index].startswith(prefix)
+        ):
+            yield self._terms[index]
+            index += 1
+
+    def search(self, terms, limit):
+        with self._lock:
+            self._ensure_built()
+            total = len(self._documents) or 1
+            scores = None
+            for prefix in terms:
+                term_scores = defaultdict(float)
+                for term in self._expand(prefix):
+                    postings = self._postings[term]
+                    idf = math.log(1 + total / len(postings))
+                    for post_id, counts in postings.items():
+                        term_scores[post_id] += idf * sum(
+                            weight * count / (count + 1.2)
+                            for weight, count in zip(FIELD_WEIGHTS, counts)
+                        )
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {
+                        post_id: score + term_scores[post_id]
+                        for post_id, score in scores.items()
+                        if post_id in term_scores
+                    }
+            ranked = sorted(
+                (scores or {}).items(), key=lambda item: (-item[1], item[0])
+            )
+            return [post_id for post_id, _ in ranked[:limit]]
+
+
+python_index = PythonIndex()
+
+
+def fts5_enabled():
+    if connection.vendor != 'sqlite':
+        return False
+    # Проверка наличия таблицы кешируется на соединении для его базы.
+    name = connection.settings_dict['NAME']
+    cached = getattr(connection, '_blog_fts5', None)
+    if cached is None or cached[0] != name:
+        cached = connection._blog_fts5 = (
+            name, FTS_TABLE in connection.introspection.table_names()
+        )
+    return cached[1]
+
+
+def get_index():
+    if settings.BLOG_SEARCH_BACKEND == 'python' or not fts5_enabled():
+        return python_index
+    return Fts5Index()
+
+
+def index_posts(posts):
+    get_index().add(posts)
+
+
+def reindex_posts(post_list, chunk_size=1000):
+    index = get_index()
+    chunk = []
+    for post in posts_to_index().filter(
+        pk__in=post_list.values('pk')
+    ).iterator(chunk_size=chunk_size):
+        chunk.append(post)
+        if len(chunk) == chunk_size:
+            index.add(chunk)
+            chunk = []
+    index.add(chunk)
+
+
+def unindex_posts(post_ids):
+    get_index().remove(post_ids)
+
+
+def search_post_ids(query, limit):
+    terms = tokenize(query)
+    if not terms:
+        return []
+    return get_index().search(terms, limit)
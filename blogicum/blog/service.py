@@ -1,12 +1,30 @@
-import datetime
-
+from django.conf import settings
 from django.core.paginator import Paginator
-from django.db.models import Count
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.http import Http404
+
+from blog.constants import COMMENTS_PER_PAGE
+from blog.lookups import categories, with_cached_lookups
+from blog.models import Comments, Post
+from blog.pagination import CursorPaginator
+from blog.scheduler import publish_due_posts_if_needed
 
-from blog.models import Post
+
+def use_cursor_pagination(request):
+    return (
+        settings.BLOG_PAGINATION == 'cursor'
+        or 'cursor' in request.GET
+    )
 
 
 def paginator(post_list, num_of_posts, request):
+    if use_cursor_pagination(request):
+        return CursorPaginator(
+            post_list,
+            num_of_posts
+        ).get_page(request.GET.get('cursor'))
+
     return Paginator(
         post_list,
         num_of_posts
@@ -14,24 +32,50 @@ def paginator(post_list, num_of_posts, request):
 
 
 def get_post_list():
-    return Post.objects.select_related(
-        'category',
-        'author',
-        'location'
-    )
+    # Категория и местоположение — из памяти (blog.lookups), без JOIN.
+    return with_cached_lookups(Post.objects.select_related('author'))
+
+
+def get_published_category(slug):
+    category = categories.get_by_slug(slug)
+    if category is None or not category.is_published:
+        raise Http404
+    return category
 
 
 def filter_post_list(post_list):
-    return post_list.filter(
-        category__is_published=True,
-        is_published=True,
-        pub_date__lte=datetime.datetime.now()
+    publish_due_posts_if_needed()
+    return post_list.filter(is_visible=True)
+
+
+def order_post_list(post_list):
+    return post_list.order_by('-pub_date')
+
+
+def change_comment_count(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comment_count=F('comment_count') + delta
     )
 
 
-def order_and_annotate_post_list(post_list):
-    return post_list.order_by(
-        '-pub_date'
-    ).annotate(
-        comment_count=Count("comments")
+def recount_comments(post_list):
+    return post_list.update(
+        comment_count=Coalesce(
+            Subquery(
+                Comments.objects.filter(
+                    post=OuterRef('pk')
+                ).order_by().values('post').annotate(
+                    total=Count('pk')
+                ).values('total')
+            ),
+            0
+        )
     )
+
+
+def get_comments_page(post, cursor=None):
+    return CursorPaginator(
+        post.comments.select_related('author'),
+        COMMENTS_PER_PAGE,
+        ordering='created_at'
+    ).get_page(cursor)
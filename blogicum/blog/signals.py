@@ -0,0 +1,215 @@
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django.db.models.signals import (post_delete, post_init, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from blog.cache import ALL_FEEDS, invalidate_feeds, invalidate_post_cards
+from blog.images import process_post_image
+from blog.lookups import categories, locations
+from blog.models import Category, Comments, Location, Post, PostRanking
+from blog.ranking import add_activity, rank_posts
+from blog.scheduler import is_post_visible, posts_published, reset_next_due
+from blog.search import index_posts, reindex_posts, unindex_posts
+from blog.service import change_comment_count, recount_comments
+
+User = get_user_model()
+
+
+def post_feed_scopes(category_ids, username):
+    slugs = Category.objects.filter(
+        pk__in=[pk for pk in category_ids if pk is not None]
+    ).values_list('slug', flat=True)
+    return [
+        'index',
+        'popular',
+        f'profile:{username}',
+        *(f'category:{slug}' for slug in slugs),
+    ]
+
+
+@receiver(post_init, sender=Post)
+def remember_post_state(sender, instance, **kwargs):
+    # Пост мог сменить категорию — сбросить нужно обе ленты.
+    # Через __dict__, чтобы не подгружать отложенные (.only/.defer) поля.
+    image = instance.__dict__.get('image')
+    instance._initial_category_id = instance.__dict__.get('category_id')
+    instance._initial_image = getattr(image, 'name', image)
+
+
+@receiver(pre_save, sender=Post)
+def update_post_visibility(sender, instance, **kwargs):
+    instance.is_visible = is_post_visible(instance)
+
+
+@receiver((post_save, post_delete), sender=Post)
+def post_changed(sender, instance, **kwargs):
+    reset_next_due()
+    invalidate_post_cards([instance.pk])
+    invalidate_feeds(post_feed_scopes(
+        {instance.category_id, instance._initial_category_id},
+        instance.author.username
+    ))
+    instance._initial_category_id = instance.category_id
+
+
+@receiver(post_save, sender=Post)
+def post_image_changed(sender, instance, **kwargs):
+    if instance.image and instance.image.name != instance._initial_image:
+        # Карточка закеширована с оригиналом — обновим её, когда копии готовы.
+        process_post_image(
+            instance.pk,
+            instance.image.name,
+            on_done=lambda pk: invalidate_post_cards([pk])
+        )
+    instance._initial_image = instance.image.name
+
+
+@receiver(posts_published, sender=Post)
+def scheduled_posts_published(sender, post_ids, **kwargs):
+    posts = Post.objects.filter(pk__in=post_ids).values_list(
+        'category_id', 'author__username'
+    )
+    scopes = {'index', 'popular'}
+    for category_id, username in posts:
+        scopes.update(post_feed_scopes({category_id}, username))
+    invalidate_feeds(scopes)
+
+
+@receiver(post_save, sender=Comments)
+def count_new_comment(sender, instance, created, **kwargs):
+    # Здесь, а не во view: комментарии создаёт и админка, и ORM напрямую.
+    # До comment_changed, чтобы карточки сбрасывались уже с новым числом.
+    if created:
+        change_comment_count(instance.post_id, 1)
+
+
+@receiver((post_save, post_delete), sender=Comments)
+def comment_changed(sender, instance, **kwargs):
+    invalidate_post_cards([instance.post_id])
+    Post.objects.filter(pk=instance.post_id).update(
+        updated_at=timezone.now()
+    )
+    post = Post.objects.filter(pk=instance.post_id).values(
+        'category_id', 'author__username'
+    ).first()
+    if post is not None:
+        invalidate_feeds(post_feed_scopes(
+            {post['category_id']}, post['author__username']
+        ))
+
+
+@receiver(post_delete, sender=Comments)
+def recount_deleted_comment(sender, instance, **kwargs):
+    # Пересчёт, а не -1: сюда же приходят удаления из админки и каскадом
+    # с автором, а повторное удаление того же комментария параллельным
+    # запросом не уведёт счётчик в минус.
+    recount_comments(Post.objects.filter(pk=instance.post_id))
+
+
+# Перед удалением: после него посты уже отвязаны через SET_NULL.
+@receiver((post_save, pre_delete), sender=Category)
+def category_changed(sender, instance, signal, **kwargs):
+    posts = Post.objects.filter(category=instance)
+    now = timezone.now()
+    if signal is pre_delete or not instance.is_published:
+        posts.update(is_visible=False, updated_at=now)
+    else:
+        posts.update(updated_at=now)
+        posts.filter(
+            is_published=True,
+            pub_date__lte=now
+        ).update(is_visible=True)
+    reset_next_due()
+
+    invalidate_post_cards(posts.values_list('pk', flat=True))
+    # Видимость постов меняется и в профилях их авторов.
+    invalidate_feeds([ALL_FEEDS])
+
+
+@receiver((post_save, pre_delete), sender=Location)
+def location_changed(sender, instance, **kwargs):
+    posts = Post.objects.filter(location=instance)
+    posts.update(updated_at=timezone.now())
+    invalidate_post_cards(posts.values_list('pk', flat=True))
+    invalidate_feeds([ALL_FEEDS])
+
+
+@receiver(post_save, sender=User)
+def author_changed(sender, instance, update_fields=None, **kwargs):
+    # Вход пользователя обновляет только last_login — карточки не меняются.
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    # И посты, которые он комментировал: имя видно на странице поста, а её
+    # версия для условных GET — updated_at.
+    posts = Post.objects.filter(
+        Q(author=instance)
+        | Q(pk__in=Comments.objects.filter(author=instance).values('post'))
+    )
+    posts.update(updated_at=timezone.now())
+    invalidate_post_cards(posts.values_list('pk', flat=True))
+    invalidate_feeds([ALL_FEEDS])
+
+
+# Справочники в памяти процесса.
+@receiver((post_save, post_delete), sender=Category)
+def reset_category_lookup(sender, **kwargs):
+    categories.invalidate()
+
+
+@receiver((post_save, post_delete), sender=Location)
+def reset_location_lookup(sender, **kwargs):
+    locations.invalidate()
+
+
+# Поисковый индекс.
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    index_posts([instance])
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    unindex_posts([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Location)
+def reindex_related_posts(sender, instance, **kwargs):
+    reindex_posts(instance.posts.all())
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Location)
+def remember_related_posts(sender, instance, **kwargs):
+    instance._search_post_ids = list(
+        instance.posts.values_list('pk', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Location)
+def reindex_unlinked_posts(sender, instance, **kwargs):
+    reindex_posts(Post.objects.filter(pk__in=instance._search_post_ids))
+
+
+# Лента «Популярное».
+@receiver(post_save, sender=Post)
+def rank_post(sender, instance, **kwargs):
+    rank_posts([instance.pk])
+
+
+@receiver(post_save, sender=Comments)
+def rank_new_comment(sender, instance, created, **kwargs):
+    if created:
+        add_activity(instance.post_id, instance.created_at)
+
+
+@receiver(post_delete, sender=Comments)
+def rank_deleted_comment(sender, instance, **kwargs):
+    # Только если счёт есть: при каскадном удалении поста новый счёт
+    # помешал бы удалить сам пост.
+    rank_posts(PostRanking.objects.filter(
+        post_id=instance.post_id
+    ).values_list('post_id', flat=True))
@@ -0,0 +1,143 @@
+"""Сборка статики с хешами в именах и предварительным сжатием, и её отдача.
+
+collectstatic с CompressedManifestStaticFilesStorage кладёт в STATIC_ROOT
+копии с хешем содержимого в имени (манифест staticfiles.json), а рядом с
+текстовыми файлами — .gz и .br; brotli — если установлен пакет Brotli.
+StaticFileIndex — карта URL -> файлы в STATIC_ROOT для
+blog.middleware.StaticFilesMiddleware, строится один раз при старте.
+"""
+import gzip
+import mimetypes
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.http import FileResponse
+from django.utils.http import http_date
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Картинки и шрифты уже сжаты — повторно их не сжимаем.
+COMPRESSIBLE_EXTENSIONS = {
+    '.css', '.js', '.mjs', '.map', '.json', '.svg', '.txt', '.xml', '.html',
+    '.ico', '.ttf', '.otf', '.eot',
+}
+# Сжатая копия сохраняется, только если она заметно меньше оригинала.
+MIN_COMPRESSION_RATIO = 0.95
+# Кодировки в порядке предпочтения -> расширение сжатой копии.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def compress(content):
+    """{расширение: сжатые байты} для выгодных вариантов сжатия."""
+    variants = {'.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(content)
+    return {
+        suffix: data for suffix, data in variants.items()
+        if len(data) < len(content) * MIN_COMPRESSION_RATIO
+    }
+
+
+def compress_file(path):
+    """Кладёт рядом с файлом .gz/.br -> список созданных путей."""
+    if os.path.splitext(path)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+        return []
+    with open(path, 'rb') as file:
+        content = file.read()
+    created = []
+    for suffix, data in compress(content).items():
+        with open(path + suffix, 'wb') as file:
+            file.write(data)
+        created.append(path + suffix)
+    return created
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in set(self.hashed_files.values()):
+            compress_file(self.path(name))
+
+
+def accepted_encodings(header):
+    """Кодировки из Accept-Encoding, кроме явно запрещённых q=0."""
+    encodings = set()
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        quality = params.strip()
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        encodings.add(coding.strip().lower())
+    return encodings
+
+
+class StaticFileIndex:
+    """URL -> (путь, сжатые варианты, Last-Modified) для файлов STATIC_ROOT.
+
+    Диск обходится один раз; хешированные имена (значения манифеста)
+    кешируются клиентом на max_age, остальные — ненадолго.
+    """
+
+    def __init__(self, root, prefix, max_age, manifest_names=()):
+        self.prefix = prefix
+        self.max_age = max_age
+        self.immutable = set(manifest_names)
+        self.files = {}
+        for directory, _, names in os.walk(root):
+            names = set(names)
+            for name in names:
+                if name[-3:] in ('.gz', '.br') and name[:-3] in names:
+                    continue
+                path = os.path.join(directory, name)
+                variants = {
+                    coding: path + suffix
+                    for coding, suffix in ENCODINGS
+                    if name + suffix in names
+                }
+                relative = os.path.relpath(path, root).replace(os.sep, '/')
+                self.files[prefix + relative] = (
+                    path, variants, http_date(os.stat(path).st_mtime)
+                )
+
+    def response(self, request):
+        entry = self.files.get(request.path)
+        if entry is None:
+            return None
+        path, variants, last_modified = entry
+
+        accepted = accepted_encodings(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        encoding = next(
+            (coding for coding, _ in ENCODINGS
+             if coding in accepted and coding in variants),
+            None
+        )
+        content_type, _ = mimetypes.guess_type(path)
+        response = FileResponse(
+            open(variants[encoding] if encoding else path, 'rb'),
+            content_type=content_type or 'application/octet-stream',
+            filename=os.path.basename(path),
+        )
+        if encoding:
+            response['Content-Encoding'] = encoding
+        response['Vary'] = 'Accept-Encoding'
+        response['Last-Modified'] = last_modified
+        if request.path[len(self.prefix):] in self.immutable:
+            response['Cache-Control'] = (
+                f'public, max-age={self.max_age}, immutable'
+            )
+        else:
+            # Имя без хеша может получить новое содержимое в любой момент.
+            response['Cache-Control'] = 'public, max-age=60'
+        return response
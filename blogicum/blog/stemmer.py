@@ -0,0 +1,90 @@
+"""Стеммер Портера (Snowball) для русского языка."""
+import re
+from functools import lru_cache
+
+VOWELS = 'аеиоуыэюя'
+# Словарь текстов невелик, а стеммер зовётся на каждое слово индексации.
+STEM_CACHE_SIZE = 100_000
+
+PERFECTIVE_GERUND = re.compile(
+    r'(?:ив|ивши|ившись|ыв|ывши|ывшись|(?<=[ая])(?:в|вши|вшись))$'
+)
+REFLEXIVE = re.compile(r'(?:ся|сь)$')
+ADJECTIVE = (
+    r'(?:ее|ие|ые|ое|ими|ыми|ей|ий|ый|ой|ем|им|ым|ом|его|ого|ему|ому|их|ых'
+    r'|ую|юю|ая|яя|ою|ею)'
+)
+ADJECTIVAL = re.compile(
+    rf'(?:ивш|ывш|ующ|(?<=[ая])(?:ем|нн|вш|ющ|щ))?{ADJECTIVE}$'
+)
+VERB = re.compile(
+    r'(?:ила|ыла|ена|ейте|уйте|ите|или|ыли|ей|уй|ил|ыл|им|ым|ен|ило|ыло'
+    r'|ено|ят|ует|уют|ит|ыт|ены|ить|ыть|ишь|ую|ю'
+    r'|(?<=[ая])(?:ла|на|ете|йте|ли|й|л|ем|н|ло|но|ет|ют|ны|ть|ешь|нно))$'
+)
+NOUN = re.compile(
+    r'(?:а|ев|ов|ие|ье|е|иями|ями|ами|еи|ии|и|ией|ей|ой|ий|й|иям|ям|ием'
+    r'|ем|ам|ом|о|у|ах|иях|ях|ы|ь|ию|ью|ю|ия|ья|я)$'
+)
+DERIVATIONAL = re.compile(r'ость?$')
+SUPERLATIVE = re.compile(r'ейше?$')
+
+
+def _region_after_consonant(word, start):
+    """Начало области после первой согласной, идущей за гласной."""
+    for index in range(start + 1, len(word)):
+        if word[index] not in VOWELS and word[index - 1] in VOWELS:
+            return index + 1
+    return len(word)
+
+
+def _cut(pattern, word):
+    match = pattern.search(word)
+    if match is None:
+        return word, False
+    return word[:match.start()], True
+
+
+@lru_cache(maxsize=STEM_CACHE_SIZE)
+def stem(word):
+    word = word.lower().replace('ё', 'е')
+    rv_start = next(
+        (index + 1 for index, char in enumerate(word) if char in VOWELS),
+        None
+    )
+    if rv_start is None:
+        return word
+    r2_start = _region_after_consonant(
+        word, _region_after_consonant(word, 0)
+    )
+    prefix, rv = word[:rv_start], word[rv_start:]
+
+    # Шаг 1.
+    rv, found = _cut(PERFECTIVE_GERUND, rv)
+    if not found:
+        rv, _ = _cut(REFLEXIVE, rv)
+        for pattern in (ADJECTIVAL, VERB, NOUN):
+            rv, found = _cut(pattern, rv)
+            if found:
+                break
+
+    # Шаг 2.
+    if rv.endswith('и'):
+        rv = rv[:-1]
+
+    # Шаг 3.
+    match = DERIVATIONAL.search(rv)
+    if match and rv_start + match.start() >= r2_start:
+        rv = rv[:match.start()]
+
+    # Шаг 4.
+    if rv.endswith('нн'):
+        rv = rv[:-1]
+    else:
+        rv, found = _cut(SUPERLATIVE, rv)
+        if found and rv.endswith('нн'):
+            rv = rv[:-1]
+        elif not found and rv.endswith('ь'):
+            rv = rv[:-1]
+
+    return prefix + rv
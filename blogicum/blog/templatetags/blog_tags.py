@@ -0,0 +1,35 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from blog.cache import render_post_card
+from blog.images import get_variants
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card(post):
+    return mark_safe(render_post_card(post))
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post):
+    variants = get_variants(post.image.name)
+    jpeg = variants['jpg']
+    return {
+        'post': post,
+        'src': jpeg[0][0] if jpeg else post.image.url,
+        'srcset': ', '.join(f'{url} {width}w' for url, width in jpeg),
+        'webp_srcset': ', '.join(
+            f'{url} {width}w' for url, width in variants['webp']
+        ),
+    }
+
+
+@register.simple_tag(takes_context=True)
+def query_replace(context, **kwargs):
+    """Текущая строка запроса с заменёнными параметрами (?q=...&page=2)."""
+    query = context['request'].GET.copy()
+    for key, value in kwargs.items():
+        query[key] = value
+    return query.urlencode()
@@ -0,0 +1,55 @@
+"""Кешируемая загрузка шаблонов и прогрев кеша при старте процесса."""
+import copy
+from pathlib import Path
+
+from django.conf import settings
+from django.template import engines
+
+PLAIN_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+CACHED_LOADER = 'django.template.loaders.cached.Loader'
+
+
+def template_settings(cached):
+    """Копия settings.TEMPLATES с кешируемым загрузчиком или без него."""
+    templates = copy.deepcopy(settings.TEMPLATES)
+    for template in templates:
+        if template['BACKEND'].endswith('.DjangoTemplates'):
+            template.pop('APP_DIRS', None)
+            template['OPTIONS']['loaders'] = (
+                [(CACHED_LOADER, PLAIN_LOADERS)] if cached
+                else list(PLAIN_LOADERS)
+            )
+    return templates
+
+
+def iter_template_names(directory):
+    directory = Path(directory)
+    for path in sorted(directory.rglob('*.html')):
+        yield path.relative_to(directory).as_posix()
+
+
+def warm_template_cache():
+    """Компилирует шаблоны из DIRS всех движков Django -> их число.
+
+    Без кешируемого загрузчика прогрев бесполезен: шаблоны только
+    проверяются на ошибки синтаксиса.
+    """
+    count = 0
+    for backend in engines.all():
+        engine = getattr(backend, 'engine', None)
+        if engine is None:
+            continue
+        for directory in engine.dirs:
+            for name in iter_template_names(directory):
+                engine.get_template(name)
+                count += 1
+    return count
+
+
+def warm_up_on_startup():
+    """Вызывается из blogicum.wsgi и blogicum.asgi."""
+    if settings.BLOG_TEMPLATE_WARMUP:
+        warm_template_cache()
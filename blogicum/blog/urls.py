@@ -1,12 +1,19 @@
+from django.conf import settings
 from django.urls import include, path
 
-from . import views
+from . import async_views, views
 
 app_name = 'blog'
 
+
+def read_view(sync_view, async_view):
+    """Асинхронная версия страницы при BLOG_ASYNC_VIEWS (под ASGI)."""
+    return async_view if settings.BLOG_ASYNC_VIEWS else sync_view
+
+
 post_urls = [
     path('<int:pk>/',
-         views.PostDetailView.as_view(),
+         read_view(views.PostDetailView.as_view(), async_views.post_detail),
          name='post_detail'),
 
     path('create/',
@@ -26,13 +33,19 @@ post_urls = [
 urlpatterns = [
     # Посты.
     path('',
-         views.IndexListView.as_view(),
+         read_view(views.IndexListView.as_view(), async_views.index),
          name='index'),
 
+    path('popular/', views.popular_posts, name='popular'),
+
     path('posts/', include(post_urls)),
 
 
     # Комменты.
+    path('posts/<int:pk>/comments/',
+         views.post_comments,
+         name='post_comments'),
+
     path('posts/<int:pk>/comment/',
          views.add_comment,
          name='add_comment'),
@@ -45,16 +58,27 @@ urlpatterns = [
          views.delete_comment,
          name='delete_comment'),
 
-    path('category/<slug:category_slug>/', views.category_posts,
+    path('category/<slug:category_slug>/',
+         read_view(views.category_posts, async_views.category_posts),
          name='category_posts'),
 
+    path('search/', views.search, name='search'),
+
 
     # Профиль.
     path('profile/<str:username>/',
-         views.ProfileListView.as_view(),
+         read_view(views.ProfileListView.as_view(), async_views.profile),
          name='profile'),
 
     path('edit_profile/',
          views.EditProfileUpdateView.as_view(),
          name='edit_profile'),
+
+
+    # Выгрузка.
+    path('export/', views.export_posts, name='export_posts'),
+
+
+    # Производительность.
+    path('perf/', views.performance_stats, name='performance_stats'),
 ]
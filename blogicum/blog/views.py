@@ -1,27 +1,43 @@
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.http import (Http404, HttpResponseBadRequest, JsonResponse,
+                         StreamingHttpResponse)
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
+from django.utils.decorators import method_decorator
 from django.views.generic import (CreateView, DeleteView, DetailView, ListView,
                                   UpdateView)
 
-from blog.constants import PAGINATE_BY
+from blog.cache import cache_anonymous_feed, card_cache_stats, feed_cache_stats
+from blog.conditional import (category_state, conditional_page, index_state,
+                              popular_state, post_state)
+from blog.constants import PAGINATE_BY, SEARCH_RESULTS_LIMIT
+from blog.export import (EXPORT_FORMATS, export_lines, export_queryset,
+                         iter_post_records)
 from blog.forms import CommentsForm, CreatePostForm
-from blog.models import Category, Comments, Post, User
-from blog.service import (filter_post_list, get_post_list,
-                          order_and_annotate_post_list, paginator)
+from blog.models import Comments, Post, User
+from blog.profiling import view_metrics
+from blog.ranking import popular_post_list
+from blog.ratelimit import rate_limit
+from blog.scheduler import publish_due_posts_if_needed
+from blog.search import search_post_ids
+from blog.service import (filter_post_list, get_comments_page, get_post_list,
+                          get_published_category, order_post_list, paginator,
+                          use_cursor_pagination)
 
-from .mixins import DeleteAndEditPostMixin, PostMixin
+from .mixins import DeleteAndEditPostMixin, PostLoaderMixin, PostMixin
 
 
+@conditional_page(category_state)
+@cache_anonymous_feed(lambda kwargs: f"category:{kwargs['category_slug']}")
 def category_posts(request, category_slug):
-    category = get_object_or_404(
-        Category,
-        slug=category_slug,
-        is_published=True)
+    category = get_published_category(category_slug)
 
     post_list = filter_post_list(get_post_list()).filter(
-        category__slug=category_slug
+        category_id=category.pk
     ).order_by('-pub_date')
 
     context = {
@@ -31,14 +47,44 @@ def category_posts(request, category_slug):
     return render(request, 'blog/category.html', context)
 
 
+@conditional_page(popular_state)
+@cache_anonymous_feed(lambda kwargs: 'popular')
+def popular_posts(request):
+    context = {
+        'page_obj': Paginator(popular_post_list(), PAGINATE_BY).get_page(
+            request.GET.get('page')
+        ),
+    }
+    return render(request, 'blog/popular.html', context)
+
+
+def search(request):
+    query = request.GET.get('q', '').strip()
+    post_ids = search_post_ids(query, SEARCH_RESULTS_LIMIT)
+    posts = filter_post_list(get_post_list()).in_bulk(post_ids)
+    ranked = [posts[post_id] for post_id in post_ids if post_id in posts]
+
+    context = {
+        'query': query,
+        'page_obj': Paginator(ranked, PAGINATE_BY).get_page(
+            request.GET.get('page')
+        ),
+    }
+    return render(request, 'blog/search.html', context)
+
+
 # Профиль.
+@method_decorator(
+    cache_anonymous_feed(lambda kwargs: f"profile:{kwargs['username']}"),
+    name='dispatch'
+)
 class ProfileListView(ListView):
     model = User
     template_name = 'blog/profile.html'
 
     def get_context_data(self, **kwargs):
         user = get_object_or_404(User, username=self.kwargs.get('username'))
-        post_list = order_and_annotate_post_list(
+        post_list = order_post_list(
             get_post_list().filter(author=user)
         )
 
@@ -67,39 +113,76 @@ class EditProfileUpdateView(LoginRequiredMixin, UpdateView):
 
 
 # Посты.
+@method_decorator(conditional_page(index_state), name='dispatch')
+@method_decorator(
+    cache_anonymous_feed(lambda kwargs: 'index'),
+    name='dispatch'
+)
 class IndexListView(ListView):
     model = Post
     template_name = 'blog/index.html'
     paginate_by = PAGINATE_BY
 
     def get_queryset(self):
-        post_list = order_and_annotate_post_list(
+        post_list = order_post_list(
             filter_post_list(get_post_list())
         )
         return post_list
 
+    def paginate_queryset(self, queryset, page_size):
+        if not use_cursor_pagination(self.request):
+            return super().paginate_queryset(queryset, page_size)
+
+        page = paginator(queryset, page_size, self.request)
+        return None, page, page.object_list, page.has_other_pages()
 
-class PostDetailView(DetailView):
+
+@method_decorator(conditional_page(post_state), name='dispatch')
+class PostDetailView(PostLoaderMixin, DetailView):
     model = Post
     template_name = 'blog/detail.html'
 
-    def get_object(self, post=Post):
-        return get_object_or_404(post, pk=self.kwargs.get('pk'))
+    def get_object(self, queryset=None):
+        publish_due_posts_if_needed()
+        post = super().get_object(queryset)
+        if post.author_id != self.request.user.id and not post.is_visible:
+            raise Http404
+        return post
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-
-        if self.get_object().author != self.request.user:
-            post_list = filter_post_list(get_post_list())
-            context['post'] = self.get_object(post_list)
-
         context['form'] = CommentsForm()
-        context['comments'] = (
-            self.object.comments.select_related('author')
-        )
+        context['comments'] = get_comments_page(self.object)
         return context
 
 
+def post_comments(request, pk):
+    post = get_object_or_404(Post, pk=pk)
+    if post.author_id != request.user.id and not post.is_visible:
+        raise Http404
+
+    page = get_comments_page(post, request.GET.get('cursor'))
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'comments': [
+                {
+                    'id': comment.id,
+                    'author': comment.author.username,
+                    'text': comment.text,
+                    'created_at': comment.created_at.isoformat(),
+                }
+                for comment in page
+            ],
+            'next_cursor': page.next_cursor,
+        })
+    return render(
+        request,
+        'includes/comment_list.html',
+        {'post': post, 'comments': page}
+    )
+
+
+@method_decorator(rate_limit('post'), name='post')
 class CreatePostCreateView(LoginRequiredMixin, CreateView):
     model = Post
     form_class = CreatePostForm
@@ -136,6 +219,7 @@ class DeletePostDeleteView(
 
 # Комменты.
 @login_required
+@rate_limit('comment')
 def add_comment(request, pk):
     post = get_object_or_404(Post, pk=pk)
     form = CommentsForm(request.POST)
@@ -144,7 +228,9 @@ def add_comment(request, pk):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        # Счётчик комментариев увеличивает сигнал — в той же транзакции.
+        with transaction.atomic():
+            comment.save()
     return redirect('blog:post_detail', pk=pk)
 
 
@@ -172,6 +258,44 @@ def delete_comment(request, post_id, comment_id):
     instance = get_object_or_404(Comments, id=comment_id, post__id=post_id)
 
     if request.method == 'POST' and instance.author == request.user:
+        # comment_count пересчитывает сигнал (blog.signals).
         instance.delete()
         return redirect('blog:post_detail', pk=post_id)
     return render(request, 'blog/comment.html')
+
+
+# Выгрузка.
+@staff_member_required
+def export_posts(request):
+    export_format = request.GET.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return HttpResponseBadRequest('Неизвестный формат выгрузки.')
+    try:
+        post_list = export_queryset(
+            request.GET.get('from'),
+            request.GET.get('to'),
+            request.GET.get('category'),
+            request.GET.get('author'),
+            request.GET.get('after_id'),
+        )
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+
+    response = StreamingHttpResponse(
+        export_lines(export_format, iter_post_records(post_list)),
+        content_type=EXPORT_FORMATS[export_format]
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="posts.{export_format}"'
+    )
+    return response
+
+
+# Производительность.
+@staff_member_required
+def performance_stats(request):
+    return JsonResponse({
+        'views': view_metrics.snapshot(),
+        'post_card_cache': card_cache_stats(),
+        'feed_cache': feed_cache_stats(),
+    })
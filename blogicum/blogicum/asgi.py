@@ -9,8 +9,25 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 
 import os
 
+from asgiref.sync import ThreadSensitiveContext
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
-application = get_asgi_application()
+
+def thread_per_request(django_application):
+    # Django 3.2 выполняет синхронный код всех запросов (ORM, шаблоны,
+    # синхронные middleware) в одном общем потоке; отдельный контекст
+    # даёт каждому запросу свой поток и своё соединение с базой.
+    async def application(scope, receive, send):
+        async with ThreadSensitiveContext():
+            await django_application(scope, receive, send)
+
+    return application
+
+
+application = thread_per_request(get_asgi_application())
+
+from blog.templating import warm_up_on_startup  # noqa: E402
+
+warm_up_on_startup()
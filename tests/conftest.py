@@ -32,6 +32,44 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    from django.core.cache import caches
+
+    from blog.lookups import categories, locations
+
+    yield
+    for cache in caches.all():
+        cache.clear()
+    categories.clear()
+    locations.clear()
+
+
+@pytest.fixture
+def shared_feed_cache(settings, tmp_path):
+    """Кеш лент, общий для процессов: только с ним у лент есть ETag."""
+    settings.CACHES = {
+        **settings.CACHES,
+        'feeds': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path / 'feeds'),
+        },
+    }
+    settings.BLOG_FEED_CACHE = 'feeds'
+
+
+@pytest.fixture
+def async_urls(settings):
+    """Маршруты с асинхронными страницами (BLOG_ASYNC_VIEWS)."""
+    from blog.benchmarking import reload_urlconf
+
+    settings.BLOG_ASYNC_VIEWS = True
+    reload_urlconf()
+    yield
+    settings.BLOG_ASYNC_VIEWS = False
+    reload_urlconf()
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -354,6 +392,7 @@ def cleanup(request):
                     filename.endswith(".jpg")
                     or filename.endswith(".gif")
                     or filename.endswith(".png")
+                    or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
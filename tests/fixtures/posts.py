@@ -16,6 +16,39 @@ from mixer.backend.django import Mixer
 from PIL import Image
 
 
+@pytest.fixture
+def make_visible_post(mixer: Mixer, user: Model, published_category: Model):
+    """Фабрика постов, видимых в лентах: автор user, опубликованная
+    категория, публикация сутки назад; kwargs переопределяют поля.
+    """
+    def make(**kwargs) -> Model:
+        fields = {
+            "author": user,
+            "category": published_category,
+            "is_published": True,
+            "pub_date": timezone.now() - timedelta(days=1),
+            **kwargs,
+        }
+        return mixer.blend("blog.Post", **fields)
+
+    return make
+
+
+@pytest.fixture
+def visible_post(make_visible_post) -> Model:
+    return make_visible_post()
+
+
+@pytest.fixture
+def feed_urls(user: Model, published_category: Model):
+    """Ленты, в которые попадают посты make_visible_post."""
+    return [
+        "/",
+        f"/category/{published_category.slug}/",
+        f"/profile/{user.username}/",
+    ]
+
+
 @pytest.fixture
 def posts_with_unpublished_category(mixer: Mixer, user: Model):
     return mixer.cycle(N_PER_FIXTURE).blend(
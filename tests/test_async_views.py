@@ -0,0 +1,76 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import resolve
+
+from blog import async_views
+from blog.benchmarking import asgi_get
+from blog.cache import feed_cache_stats
+from blogicum.asgi import application
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts(make_visible_post):
+    visible = [make_visible_post() for _ in range(3)]
+    hidden = make_visible_post(is_published=False)
+    return visible, hidden
+
+
+@pytest.fixture
+def async_client():
+    client = AsyncClient()
+    return lambda path: async_to_sync(client.get)(path)
+
+
+@pytest.mark.usefixtures('async_urls')
+def test_read_only_routes_use_async_views(feed_urls):
+    assert resolve('/').func is async_views.index
+    assert resolve(feed_urls[1]).func is async_views.category_posts
+    assert resolve(feed_urls[2]).func is async_views.profile
+    assert resolve('/posts/1/').func is async_views.post_detail
+
+
+def test_async_feeds_match_sync_feeds(
+        async_urls, async_client, posts, feed_urls
+):
+    for url in feed_urls:
+        response = async_client(url)
+        assert response.status_code == 200
+        assert {post.pk for post in response.context['page_obj']} == {
+            post.pk for post in posts[0]
+        }
+
+
+@pytest.mark.usefixtures('async_urls')
+def test_async_post_detail(async_client, posts):
+    visible, hidden = posts
+    response = async_client(f'/posts/{visible[0].pk}/')
+    assert response.status_code == 200
+    assert response.context['post'] == visible[0]
+    assert async_client(f'/posts/{hidden.pk}/').status_code == 404
+    assert async_client('/posts/0/').status_code == 404
+    assert async_client('/category/missing/').status_code == 404
+
+
+@pytest.mark.usefixtures('async_urls')
+def test_async_feeds_use_feed_cache(async_client, posts):
+    before = feed_cache_stats()
+    first = async_client('/')
+    second = async_client('/')
+    after = feed_cache_stats()
+    assert second.content == first.content
+    assert after['misses'] - before['misses'] == 1
+    assert after['hits'] - before['hits'] == 1
+
+
+@pytest.mark.usefixtures('async_urls')
+def test_asgi_application_serves_async_views(posts):
+    assert async_to_sync(asgi_get)(application, '/') == 200
+
+
+def test_performance_middleware_under_asgi(settings, async_urls, posts):
+    settings.BLOG_PERF_SAMPLE_RATE = 1
+    response = async_to_sync(AsyncClient().get)('/')
+    assert 'db;dur=' in response['Server-Timing']
@@ -0,0 +1,40 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def dataset():
+    call_command(
+        'generate_data', users=3, categories=2, locations=2, posts=30,
+        future_share=0, unpublished_share=0, stdout=StringIO()
+    )
+
+
+def test_benchmark_writes_every_view(dataset, tmp_path):
+    output = tmp_path / 'bench.json'
+    call_command(
+        'benchmark_views', repeat=2, warmup=0, cold=True, output=str(output),
+        stdout=StringIO()
+    )
+    views = json.loads(output.read_text())['views']
+    assert {'blog:index', 'blog:post_detail', 'blog:profile',
+            'pages:about', 'pages:rules'} <= set(views)
+    index = views['blog:index']
+    assert index['status'] == 200
+    assert index['queries'] > 0
+    assert index['p99_ms'] >= index['p50_ms'] > 0
+
+
+def test_benchmark_check_fails_over_budget(dataset, tmp_path):
+    budgets = tmp_path / 'budgets.json'
+    budgets.write_text(json.dumps({'blog:index': {'queries': 0}}))
+    with pytest.raises(CommandError, match='blog:index'):
+        call_command(
+            'benchmark_views', repeat=1, warmup=0, cold=True, check=True,
+            budgets=str(budgets), stdout=StringIO()
+        )
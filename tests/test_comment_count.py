@@ -0,0 +1,69 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Comments, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_add_and_delete(
+        user_client, user, post_with_published_location
+):
+    post = post_with_published_location
+    for text in ('первый', 'второй'):
+        user_client.post(f'/posts/{post.id}/comment/', {'text': text})
+    post.refresh_from_db()
+    assert post.comment_count == 2
+
+    comment = post.comments.first()
+    user_client.post(f'/posts/{post.id}/delete_comment/{comment.id}/')
+    post.refresh_from_db()
+    assert post.comment_count == 1
+
+
+def test_orm_created_comment_updates_count(
+        another_user, post_with_published_location
+):
+    post = post_with_published_location
+    Comments.objects.create(post=post, author=another_user, text='Из ORM')
+    post.refresh_from_db()
+    assert post.comment_count == 1
+
+
+def test_recount_comments_repairs_drift(
+        mixer, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(3).blend('blog.Comments', post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=42)
+
+    call_command('recount_comments', batch_size=1, stdout=StringIO())
+    post.refresh_from_db()
+    assert post.comment_count == 3
+
+
+def test_repeated_delete_keeps_count(
+        mixer, post_with_published_location
+):
+    post = post_with_published_location
+    comment = mixer.blend('blog.Comments', post=post)
+    mixer.blend('blog.Comments', post=post)
+    # Два запроса удаляют один комментарий: второй не находит строку.
+    stale = Comments.objects.get(pk=comment.pk)
+    comment.delete()
+    stale.delete()
+    post.refresh_from_db()
+    assert post.comment_count == 1
+
+
+def test_cascade_delete_updates_count(
+        mixer, another_user, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend('blog.Comments', post=post, author=another_user)
+    mixer.blend('blog.Comments', post=post)
+    another_user.delete()
+    post.refresh_from_db()
+    assert post.comment_count == 1
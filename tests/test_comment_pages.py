@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.constants import COMMENTS_PER_PAGE
+from blog.models import Comments
+
+pytestmark = [pytest.mark.django_db]
+
+N_COMMENTS = COMMENTS_PER_PAGE * 2 + 5
+
+
+@pytest.fixture
+def commented_post(mixer, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(N_COMMENTS).blend('blog.Comments', post=post)
+    # Часть комментариев с одинаковым временем — проверка порядка по id.
+    start = timezone.now() - timedelta(days=1)
+    for index, comment in enumerate(comments):
+        Comments.objects.filter(pk=comment.pk).update(
+            created_at=start + timedelta(minutes=index // 3)
+        )
+    return post
+
+
+def test_detail_renders_first_page(client, commented_post):
+    response = client.get(f'/posts/{commented_post.id}/')
+    page = response.context['comments']
+    assert len(page) == COMMENTS_PER_PAGE
+    assert page.has_next()
+    assert 'data-comments-more' in response.content.decode()
+
+
+def test_comment_pages_cover_all_comments_in_order(client, commented_post):
+    expected = list(
+        commented_post.comments.order_by('created_at', 'pk')
+        .values_list('pk', flat=True)
+    )
+    seen, cursor = [], ''
+    while cursor is not None:
+        data = client.get(
+            f'/posts/{commented_post.id}/comments/',
+            {'cursor': cursor, 'format': 'json'}
+        ).json()
+        seen.extend(comment['id'] for comment in data['comments'])
+        cursor = data['next_cursor']
+    assert seen == expected
+
+
+def test_comment_fragment_is_html(client, commented_post):
+    first = client.get(f'/posts/{commented_post.id}/')
+    cursor = first.context['comments'].next_cursor
+    response = client.get(
+        f'/posts/{commented_post.id}/comments/', {'cursor': cursor}
+    )
+    content = response.content.decode()
+    assert '<html' not in content
+    assert content.count('class="media mb-4"') == COMMENTS_PER_PAGE
+
+
+def test_hidden_post_comments_are_not_served(
+        another_user_client, commented_post
+):
+    commented_post.is_published = False
+    commented_post.save()
+    response = another_user_client.get(
+        f'/posts/{commented_post.id}/comments/'
+    )
+    assert response.status_code == 404
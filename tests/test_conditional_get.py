@@ -0,0 +1,127 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def feed_cache(shared_feed_cache):
+    pass
+
+
+@pytest.fixture(autouse=True, params=['sync', 'async'])
+def views_mode(request):
+    if request.param == 'async':
+        request.getfixturevalue('async_urls')
+    return request.param
+
+
+@pytest.fixture
+def urls(visible_post, published_category):
+    return [
+        '/',
+        f'/category/{published_category.slug}/',
+        f'/posts/{visible_post.pk}/',
+    ]
+
+
+def test_matching_etag_returns_304_without_rendering(
+        client, urls, django_assert_max_num_queries
+):
+    for url in urls:
+        response = client.get(url)
+        assert response['ETag'] and response['Last-Modified']
+        with django_assert_max_num_queries(1):
+            repeated = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        assert repeated.status_code == HTTPStatus.NOT_MODIFIED
+        assert not repeated.content
+        repeated = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert repeated.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_feed_validators_skip_database(client, urls,
+                                       django_assert_num_queries):
+    etag = client.get('/')['ETag']
+    with django_assert_num_queries(0):
+        client.get('/', HTTP_IF_NONE_MATCH=etag)
+
+
+def test_comment_changes_validators(client, user_client, visible_post, urls):
+    etags = [client.get(url)['ETag'] for url in urls]
+    user_client.post(f'/posts/{visible_post.pk}/comment/', {'text': 'Новый'})
+    for url, etag in zip(urls, etags):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        assert response['ETag'] != etag
+
+
+def test_popular_validators_follow_window_step(
+        client, settings, monkeypatch, visible_post
+):
+    response = client.get('/popular/')
+    later = timezone.now() + timedelta(hours=settings.BLOG_HOT_HALF_LIFE_HOURS)
+    monkeypatch.setattr(timezone, 'now', lambda: later)
+    for headers in ({'HTTP_IF_NONE_MATCH': response['ETag']},
+                    {'HTTP_IF_MODIFIED_SINCE': response['Last-Modified']}):
+        assert client.get('/popular/', **headers).status_code == HTTPStatus.OK
+
+
+def test_post_edit_changes_updated_at(user_client, visible_post):
+    updated_at = visible_post.updated_at
+    etag = user_client.get(f'/posts/{visible_post.pk}/')['ETag']
+    visible_post.title = 'Новый заголовок'
+    visible_post.save()
+    assert visible_post.updated_at > updated_at
+    response = user_client.get(
+        f'/posts/{visible_post.pk}/', HTTP_IF_NONE_MATCH=etag
+    )
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_commenter_rename_changes_validators(
+        client, mixer, another_user, visible_post
+):
+    mixer.blend('blog.Comments', post=visible_post, author=another_user)
+    url = f'/posts/{visible_post.pk}/'
+    etag = client.get(url)['ETag']
+    another_user.username = 'renamed'
+    another_user.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert 'renamed' in response.content.decode()
+
+
+def test_validators_depend_on_user(client, user_client, urls):
+    for url in urls:
+        anonymous = client.get(url)
+        authenticated = user_client.get(url)
+        assert anonymous['ETag'] != authenticated['ETag']
+        assert not authenticated.has_header('Last-Modified')
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=anonymous['ETag'])
+        assert response.status_code == HTTPStatus.OK
+
+
+def test_no_feed_validators_with_process_local_cache(
+        client, settings, visible_post, urls
+):
+    settings.BLOG_FEED_CACHE = 'default'
+    feeds = urls[:2]
+    for url in feeds:
+        assert not client.get(url).has_header('ETag')
+    assert client.get(urls[2]).has_header('ETag')
+
+
+def test_hidden_pages_have_no_validators(client, mixer, visible_post):
+    category = mixer.blend('blog.Category', is_published=False)
+    hidden = mixer.blend(
+        'blog.Post', author=visible_post.author, category=category
+    )
+    for url in (f'/category/{category.slug}/', f'/posts/{hidden.pk}/'):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        assert not response.has_header('ETag')
@@ -0,0 +1,112 @@
+import csv
+import io
+import json
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.test import Client
+from django.utils import timezone
+
+from blog.export import export_queryset, iter_post_records
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def posts(mixer, make_visible_post, user, another_user, published_category,
+          published_location):
+    now = timezone.now()
+    posts = [
+        make_visible_post(
+            author=author,
+            category=published_category if number % 2 else None,
+            location=published_location,
+            pub_date=now - timedelta(days=10 - number),
+        )
+        for number, author in enumerate([user, another_user, user, user])
+    ]
+    for post in posts[:2]:
+        mixer.cycle(2).blend('blog.Comments', post=post, author=another_user)
+    return posts
+
+
+@pytest.fixture
+def staff_client(mixer):
+    client = Client()
+    client.force_login(mixer.blend('auth.User', is_staff=True))
+    return client
+
+
+def read_ndjson(content):
+    return [json.loads(line) for line in content.splitlines()]
+
+
+def test_export_requires_staff(client, user_client):
+    for current_client in (client, user_client):
+        assert current_client.get('/export/').status_code == 302
+
+
+def test_ndjson_export_streams_posts_with_comments(staff_client, posts):
+    response = staff_client.get('/export/')
+    assert response.streaming
+    assert response['Content-Type'].startswith('application/x-ndjson')
+    records = read_ndjson(b''.join(response.streaming_content).decode())
+    assert [record['id'] for record in records] == [post.pk for post in posts]
+    assert [len(record['comments']) for record in records] == [2, 2, 0, 0]
+    assert records[1]['category']['slug'] == posts[1].category.slug
+    assert records[0]['category'] is None
+    assert records[0]['author']['username'] == posts[0].author.username
+
+
+def test_csv_export(staff_client, posts):
+    response = staff_client.get('/export/', {'format': 'csv'})
+    rows = list(csv.DictReader(io.StringIO(
+        b''.join(response.streaming_content).decode()
+    )))
+    assert [row['record'] for row in rows].count('post') == 4
+    assert [row['record'] for row in rows].count('comment') == 4
+    assert rows[1]['post_id'] == str(posts[0].pk)
+
+
+def test_export_filters(staff_client, posts, user):
+    def exported_ids(**params):
+        response = staff_client.get('/export/', params)
+        return [
+            record['id'] for record in
+            read_ndjson(b''.join(response.streaming_content).decode())
+        ]
+
+    assert exported_ids(author=user.username) == [
+        posts[0].pk, posts[2].pk, posts[3].pk
+    ]
+    assert exported_ids(category=posts[1].category.slug) == [
+        posts[1].pk, posts[3].pk
+    ]
+    assert exported_ids(after_id=posts[1].pk) == [posts[2].pk, posts[3].pk]
+    assert exported_ids(
+        **{'from': posts[1].pub_date.isoformat(), 'to': posts[2].pub_date.date()}
+    ) == [posts[1].pk, posts[2].pk]
+    assert staff_client.get('/export/', {'from': 'вчера'}).status_code == 400
+    assert staff_client.get('/export/', {'format': 'xml'}).status_code == 400
+
+
+def test_comments_are_loaded_per_chunk(posts, django_assert_num_queries):
+    with django_assert_num_queries(3):
+        records = list(iter_post_records(export_queryset(), chunk_size=2))
+    assert len(records) == 4
+
+
+def test_export_command(posts, tmp_path):
+    output = tmp_path / 'posts.ndjson'
+    call_command(
+        'export_posts', output=str(output), after_id=posts[0].pk, chunk_size=1
+    )
+    records = read_ndjson(output.read_text(encoding='utf-8'))
+    assert [record['id'] for record in records] == [
+        post.pk for post in posts[1:]
+    ]
+
+    stdout = io.StringIO()
+    call_command('export_posts', format='csv', stdout=stdout)
+    assert stdout.getvalue().startswith('record,id,post_id')
@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.cache import feed_page_timeout
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_anonymous_feeds_are_served_from_cache(
+        client, visible_post, feed_urls, django_assert_num_queries
+):
+    for url in feed_urls:
+        first = client.get(url)
+        with django_assert_num_queries(0):
+            second = client.get(url)
+        assert second.content == first.content
+
+
+def test_authenticated_feeds_are_not_cached(user_client, visible_post):
+    user_client.get('/')
+    with CaptureQueriesContext(connection) as queries:
+        user_client.get('/')
+    assert any('"blog_post"' in query['sql'] for query in queries)
+
+
+def test_post_edit_invalidates_feeds(client, visible_post, feed_urls):
+    for url in feed_urls:
+        client.get(url)
+    visible_post.title = 'Отредактированный пост'
+    visible_post.save()
+    for url in feed_urls:
+        assert 'Отредактированный пост' in client.get(url).content.decode()
+
+
+def test_comment_invalidates_feeds(
+        client, user_client, visible_post, feed_urls
+):
+    for url in feed_urls:
+        client.get(url)
+    user_client.post(
+        f'/posts/{visible_post.id}/comment/', {'text': 'Комментарий'}
+    )
+    for url in feed_urls:
+        assert 'Комментарии (1)' in client.get(url).content.decode()
+
+
+def test_cache_expires_at_next_scheduled_post(settings, make_visible_post):
+    settings.BLOG_FEED_CACHE_TIMEOUT = 600
+    assert feed_page_timeout() == 600
+    make_visible_post(pub_date=timezone.now() + timedelta(seconds=30))
+    assert 0 < feed_page_timeout() <= 30
+
+
+def test_cursor_first_page_is_cached_separately(client, make_visible_post):
+    for _ in range(11):
+        make_visible_post()
+    assert 'page=2' in client.get('/').content.decode()
+    for _ in range(2):
+        cursor = client.get('/?cursor=').content.decode()
+        assert 'cursor=' in cursor and 'page=2' not in cursor
+
+
+def test_cached_page_gets_its_own_etag(
+        client, visible_post, shared_feed_cache
+):
+    # Та же страница кеша, но ETag считается по полному пути запроса.
+    tagged = client.get('/?utm_source=mail')
+    plain = client.get('/')
+    assert plain['ETag'] != tagged['ETag']
+    assert client.get('/', HTTP_IF_NONE_MATCH=plain['ETag']).status_code == (
+        304
+    )
@@ -0,0 +1,55 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count, F
+from django.utils import timezone
+
+from blog.models import Category, Comments, Location, Post
+from blog.search import search_post_ids
+
+pytestmark = [pytest.mark.django_db]
+
+OPTIONS = dict(
+    users=5, categories=3, locations=4, posts=50, batch_size=7,
+    comments_per_post=2, stdout=StringIO(),
+)
+
+
+def test_generate_data_creates_consistent_rows():
+    call_command('generate_data', seed=1, **OPTIONS)
+    assert Post.objects.count() == 50
+    assert Category.objects.count() == 3
+    assert Location.objects.count() == 4
+    assert Comments.objects.exists()
+    assert not Post.objects.annotate(
+        real_count=Count('comments')
+    ).exclude(comment_count=F('real_count')).exists()
+
+
+def test_generate_data_is_deterministic():
+    call_command('generate_data', seed=7, **OPTIONS)
+    first = list(Post.objects.order_by('pk').values_list(
+        'title', 'author__username', 'comment_count'
+    ))
+    Post.objects.all().delete()
+    call_command('generate_data', seed=7, **OPTIONS)
+    second = list(Post.objects.order_by('pk').values_list(
+        'title', 'comment_count'
+    ))
+    assert [(title, count) for title, _, count in first] == second
+
+
+def test_generated_comments_follow_their_posts_and_posts_are_indexed():
+    call_command('generate_data', seed=3, **OPTIONS)
+    comments = Comments.objects.select_related('post')
+    assert comments.exists()
+    assert all(
+        comment.post.pub_date <= comment.created_at <= timezone.now()
+        for comment in comments
+    )
+    assert len({comment.created_at for comment in comments}) > 1
+
+    post = Post.objects.select_related('category').first()
+    assert post.pk in search_post_ids(post.title, 100)
+    assert post.pk in search_post_ids(post.category.title, 100)
@@ -0,0 +1,119 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+from django.utils.dateparse import parse_datetime
+
+from blog.importing import DumpImporter, iter_json_objects
+from blog.models import Category, Comments, Post, User
+
+pytestmark = [pytest.mark.django_db]
+
+DB_JSON = Path(__file__).resolve().parent.parent / 'db.json'
+
+
+def record(model, pk, **fields):
+    return {'model': model, 'pk': pk, 'fields': fields}
+
+
+def post(pk, author, category=1, **fields):
+    fields = {
+        'title': f'Пост {pk}', 'text': 'Текст', 'location': None,
+        'is_published': True, 'pub_date': '2020-01-01T00:00:00Z',
+        'created_at': '2020-01-01T00:00:00Z', **fields,
+    }
+    return record('blog.post', pk, author=author, category=category, **fields)
+
+
+RECORDS = [
+    record('blog.category', 1, title='Путешествия', slug='travel',
+           description='-', is_published=True,
+           created_at='2020-01-01T00:00:00Z'),
+    # Пост раньше своего автора: уходит в отложенные и грузится в конце.
+    post(1, author=10),
+    post(2, author=10, category=None),
+    # Невалидный: заголовок длиннее 256 символов.
+    post(3, author=10, title='x' * 300),
+    record('auth.user', 10, username='writer', password='!'),
+    record('blog.comments', 1, post=1, author=10, text='Первый',
+           created_at='2020-01-02T00:00:00Z'),
+    record('blog.comments', 2, post=1, author=10, text='Второй',
+           created_at='2020-01-03T00:00:00Z'),
+    record('sessions.session', 'abc', session_data='', expire_date=None),
+]
+
+
+@pytest.mark.parametrize('layout', ['array', 'lines'])
+def test_iter_json_objects_reads_in_small_chunks(layout):
+    objects = [{'n': number, 'text': '}{ ,[]'} for number in range(5)]
+    if layout == 'array':
+        content = json.dumps(objects, ensure_ascii=False, indent=2)
+    else:
+        content = ''.join(json.dumps(obj) + '\n' for obj in objects)
+    assert list(iter_json_objects(io.StringIO(content), read_size=7)) == objects
+
+
+def test_import_resolves_references_and_reports_errors():
+    importer = DumpImporter(batch_size=2)
+    stats = importer.run(iter(RECORDS))
+
+    assert stats['rows'] == 6
+    # Посты 1-2 и их комментарии ждут автора и пост соответственно.
+    assert stats['deferred'] == 4
+    assert stats['errors'] == 1
+    assert stats['skipped'] == 1
+    assert 'blog.post pk=3' in importer.errors[0]
+    assert User.objects.get(pk=10).username == 'writer'
+    assert set(Post.objects.values_list('pk', flat=True)) == {1, 2}
+    first, second = Post.objects.order_by('pk')
+    assert first.is_visible and not second.is_visible
+    assert first.comment_count == 2
+    assert Comments.objects.count() == 2
+
+
+def test_import_keeps_dumped_dates():
+    DumpImporter(batch_size=2).run(iter(RECORDS))
+    assert Category.objects.get().created_at.isoformat() == (
+        '2020-01-01T00:00:00+00:00'
+    )
+    first = Post.objects.get(pk=1)
+    assert first.created_at.year == 2020
+    # updated_at в дампе нет — время импорта.
+    assert first.updated_at.year > 2020
+    assert [
+        comment.created_at.day
+        for comment in Comments.objects.order_by('created_at')
+    ] == [2, 3]
+    assert Post._meta.get_field('created_at').auto_now_add
+
+
+def test_import_is_resumable(tmp_path):
+    path = tmp_path / 'dump.jsonl'
+    path.write_text(
+        ''.join(json.dumps(item, ensure_ascii=False) + '\n'
+                for item in RECORDS),
+        encoding='utf-8'
+    )
+    call_command('import_dump', str(path), stdout=io.StringIO())
+    output = io.StringIO()
+    call_command('import_dump', str(path), stdout=output)
+    assert 'Загружено 0 строк' in output.getvalue()
+    assert Post.objects.count() == 2
+
+
+def test_import_repository_dump():
+    call_command('import_dump', str(DB_JSON), stdout=io.StringIO())
+    dump = json.loads(DB_JSON.read_text(encoding='utf-8'))
+    expected = {
+        model: sum(1 for item in dump if item['model'] == model)
+        for model in ('blog.category', 'blog.post', 'auth.user')
+    }
+    assert Category.objects.count() == expected['blog.category']
+    assert Post.objects.count() == expected['blog.post']
+    assert User.objects.count() == expected['auth.user']
+    first = next(item for item in dump if item['model'] == 'blog.post')
+    assert Post.objects.get(
+        pk=first['pk']
+    ).created_at == parse_datetime(first['fields']['created_at'])
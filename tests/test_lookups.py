@@ -0,0 +1,71 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.lookups import categories
+from blog.models import Category
+from blog.service import get_post_list
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def visible_post(make_visible_post, published_location):
+    return make_visible_post(location=published_location)
+
+
+def test_posts_get_category_and_location_without_joins(visible_post):
+    with CaptureQueriesContext(connection) as queries:
+        loaded = list(get_post_list())
+        assert loaded[0].category.title == visible_post.category.title
+        assert loaded[0].location.name == visible_post.location.name
+    post_queries = [
+        query['sql'] for query in queries if 'FROM "blog_post"' in query['sql']
+    ]
+    assert len(post_queries) == 1
+    assert 'blog_category' not in post_queries[0]
+    assert 'blog_location' not in post_queries[0]
+
+    with CaptureQueriesContext(connection) as queries:
+        list(get_post_list())
+    assert len(queries) == 1
+
+
+def test_category_page_uses_cached_category(user_client, visible_post):
+    url = f'/category/{visible_post.category.slug}/'
+    user_client.get(url)
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get(url)
+    assert response.context['category'] == visible_post.category
+    assert not any(
+        'FROM "blog_category"' in query['sql'] for query in queries
+    )
+    assert not any('"blog_category"."slug"' in query['sql'] for query in queries)
+
+
+def test_changes_invalidate_lookups(client, visible_post):
+    category = visible_post.category
+    category.title = 'Новое название'
+    category.save()
+    assert categories.get(category.pk).title == 'Новое название'
+
+    visible_post.location.delete()
+    assert get_post_list().get(pk=visible_post.pk).location is None
+
+    category.is_published = False
+    category.save()
+    assert client.get(f'/category/{category.slug}/').status_code == 404
+    assert client.get('/category/missing/').status_code == 404
+
+
+def test_category_created_elsewhere_is_found(client, visible_post):
+    url = f'/category/{visible_post.category.slug}/'
+    assert client.get(url).status_code == 200
+    # bulk_create не шлёт сигналов — как запись в другом процессе.
+    Category.objects.bulk_create([
+        Category(title='Новая', slug='new', description='-')
+    ])
+    category = Category.objects.get(slug='new')
+    assert categories.get_by_slug('new').pk == category.pk
+    assert client.get('/category/new/').status_code == 200
+    assert categories.get(category.pk) is not None
@@ -0,0 +1,79 @@
+from datetime import timedelta
+
+import pytest
+from conftest import N_PER_PAGE
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def dated_posts(make_visible_post):
+    now = timezone.now()
+    # Два поста с одинаковой датой проверяют разрешение ничьих по id.
+    dates = [now - timedelta(hours=i // 2) for i in range(N_PER_PAGE * 2 + 3)]
+    return [make_visible_post(pub_date=date) for date in dates]
+
+
+def _walk_feed(client, url):
+    seen, cursor, pages = [], '', 0
+    while True:
+        response = client.get(url, {'cursor': cursor})
+        page_obj = response.context['page_obj']
+        seen.extend(post.id for post in page_obj)
+        pages += 1
+        if not page_obj.has_next():
+            return seen, pages, page_obj
+        cursor = page_obj.next_cursor
+
+
+@pytest.mark.parametrize('url_name', ['index', 'category', 'profile'])
+def test_cursor_pagination_walks_whole_feed(
+        client, user, published_category, dated_posts, url_name
+):
+    url = {
+        'index': '/',
+        'category': f'/category/{published_category.slug}/',
+        'profile': f'/profile/{user.username}/',
+    }[url_name]
+    expected = [
+        post.id for post in sorted(
+            dated_posts, key=lambda p: (p.pub_date, p.id), reverse=True
+        )
+    ]
+    seen, pages, last_page = _walk_feed(client, url)
+    assert seen == expected, (
+        'Убедитесь, что курсорная пагинация обходит ленту без пропусков'
+        ' и повторов в порядке убывания даты публикации.'
+    )
+    assert pages == 3
+    assert last_page.has_previous()
+
+    response = client.get(url, {'cursor': last_page.previous_cursor})
+    assert [post.id for post in response.context['page_obj']] == (
+        expected[N_PER_PAGE:N_PER_PAGE * 2]
+    )
+
+
+def test_cursor_pagination_skips_count(client, dated_posts):
+    with CaptureQueriesContext(connection) as queries:
+        client.get('/', {'cursor': ''})
+    assert not any(
+        'COUNT(' in query['sql'] or 'OFFSET' in query['sql']
+        for query in queries
+    )
+
+
+def test_cursor_pagination_setting(client, settings, dated_posts):
+    settings.BLOG_PAGINATION = 'cursor'
+    response = client.get('/')
+    assert getattr(response.context['page_obj'], 'is_cursor', False)
+    assert '?cursor=' in response.content.decode()
+
+
+def test_broken_cursor_returns_first_page(client, dated_posts):
+    response = client.get('/', {'cursor': '!!broken!!'})
+    assert response.status_code == 200
+    assert len(response.context['page_obj']) == N_PER_PAGE
@@ -0,0 +1,43 @@
+import pytest
+
+from blog.profiling import view_metrics
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def sampled(settings):
+    settings.BLOG_PERF_SAMPLE_RATE = 1
+    view_metrics.reset()
+    yield
+    view_metrics.reset()
+
+
+def test_server_timing_header(user_client, sampled, post_with_published_location):
+    response = user_client.get(f'/posts/{post_with_published_location.id}/')
+    timing = response['Server-Timing']
+    assert 'db;dur=' in timing and 'tpl;dur=' in timing
+    assert 'total;dur=' in timing
+
+    metrics = view_metrics.snapshot()['blog:post_detail']
+    assert metrics['total_ms']['count'] == 1
+    assert metrics['queries']['sum'] > 0
+
+
+def test_sampling_off_skips_instrumentation(user_client, settings):
+    settings.BLOG_PERF_SAMPLE_RATE = 0
+    view_metrics.reset()
+    response = user_client.get('/')
+    assert 'Server-Timing' not in response
+    assert view_metrics.snapshot() == {}
+
+
+def test_stats_endpoint_is_staff_only(user_client, user, sampled):
+    user_client.get('/')
+    assert user_client.get('/perf/').status_code == 302
+
+    user.is_staff = True
+    user.save()
+    data = user_client.get('/perf/').json()
+    assert 'blog:index' in data['views']
+    assert set(data['feed_cache']) == {'hits', 'misses'}
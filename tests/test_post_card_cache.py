@@ -0,0 +1,52 @@
+import pytest
+
+from blog.cache import (card_cache_stats, get_card_cache, post_card_key,
+                        reset_card_cache_stats)
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def two_posts(make_visible_post, published_location):
+    return [make_visible_post(location=published_location) for _ in range(2)]
+
+
+def test_post_cards_are_cached(client, settings, two_posts):
+    settings.BLOG_FEED_CACHE_TIMEOUT = 0
+    reset_card_cache_stats()
+    client.get('/')
+    assert card_cache_stats() == {'hits': 0, 'misses': 2}
+    client.get('/')
+    assert card_cache_stats() == {'hits': 2, 'misses': 2}
+
+
+def test_post_save_invalidates_only_its_card(client, two_posts):
+    client.get('/')
+    changed, untouched = two_posts
+    changed.title = 'Новый заголовок'
+    changed.save()
+
+    cache = get_card_cache()
+    assert cache.get(post_card_key(changed.pk)) is None
+    assert cache.get(post_card_key(untouched.pk)) is not None
+    assert 'Новый заголовок' in client.get('/').content.decode()
+
+
+@pytest.mark.parametrize('related', ['category', 'location'])
+def test_related_save_invalidates_cards(client, two_posts, related):
+    client.get('/')
+    obj = getattr(two_posts[0], related)
+    obj.save()
+
+    cache = get_card_cache()
+    assert all(cache.get(post_card_key(post.pk)) is None
+               for post in two_posts)
+
+
+def test_comment_invalidates_card(user_client, two_posts):
+    user_client.get('/')
+    post = two_posts[0]
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Комментарий'})
+
+    assert get_card_cache().get(post_card_key(post.pk)) is None
+    assert get_card_cache().get(post_card_key(two_posts[1].pk)) is not None
@@ -0,0 +1,63 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from PIL import Image
+
+from blog.constants import IMAGE_VARIANT_WIDTHS
+from blog.images import variant_name
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.BLOG_IMAGE_PROCESSING = 'sync'
+    return tmp_path
+
+
+@pytest.fixture
+def post_with_large_image(media, make_visible_post, published_location):
+    image_io = BytesIO()
+    Image.new('RGB', (1600, 1200), color=(10, 120, 200)).save(
+        image_io, format='JPEG'
+    )
+    return make_visible_post(
+        location=published_location,
+        image=ImageFile(image_io, name='large.jpg'),
+    )
+
+
+def variant_names(post):
+    return [
+        variant_name(post.image.name, width, extension)
+        for width in IMAGE_VARIANT_WIDTHS
+        for extension in ('jpg', 'webp')
+    ]
+
+
+def test_upload_creates_variants(post_with_large_image):
+    for name in variant_names(post_with_large_image):
+        assert default_storage.exists(name)
+    with default_storage.open(variant_names(post_with_large_image)[0]) as f:
+        assert Image.open(f).width == IMAGE_VARIANT_WIDTHS[0]
+
+
+def test_card_uses_srcset(user_client, post_with_large_image):
+    content = user_client.get(
+        f'/profile/{post_with_large_image.author.username}/'
+    ).content.decode()
+    assert 'type="image/webp"' in content
+    assert f'{IMAGE_VARIANT_WIDTHS[0]}w' in content
+    assert f'href="{post_with_large_image.image.url}"' in content
+
+
+def test_backfill_command(post_with_large_image):
+    for name in variant_names(post_with_large_image):
+        default_storage.delete(name)
+    call_command('generate_image_variants', workers=1, stdout=StringIO())
+    for name in variant_names(post_with_large_image):
+        assert default_storage.exists(name)
@@ -0,0 +1,59 @@
+import pytest
+
+from blog.lookups import categories, locations
+from blog.scheduler import get_next_due
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def post(post_with_published_location):
+    # Дата ближайшей публикации и справочники кешируются; прогреваем
+    # кеши заранее.
+    get_next_due()
+    categories.get(post_with_published_location.category_id)
+    locations.get(post_with_published_location.location_id)
+    return post_with_published_location
+
+
+# Сессия и пользователь авторизованного клиента — ещё 2 запроса.
+@pytest.mark.parametrize(
+    ('client_name', 'num_queries'),
+    [('unlogged_client', 2), ('user_client', 4), ('another_user_client', 4)],
+)
+def test_post_detail_queries(
+        request, post, django_assert_num_queries, client_name, num_queries
+):
+    client = request.getfixturevalue(client_name)
+    with django_assert_num_queries(num_queries):
+        response = client.get(f'/posts/{post.id}/')
+    assert response.status_code == 200
+
+
+def test_hidden_post_detail_is_single_lookup(
+        another_user_client, post, django_assert_num_queries
+):
+    post.is_published = False
+    post.save()
+    get_next_due()
+    with django_assert_num_queries(3):
+        response = another_user_client.get(f'/posts/{post.id}/')
+    assert response.status_code == 404
+
+
+# Форма редактирования добавляет выборки категорий и местоположений.
+@pytest.mark.parametrize(('action', 'num_queries'), [('edit', 5), ('delete', 3)])
+def test_post_edit_and_delete_load_post_once(
+        user_client, post, django_assert_num_queries, action, num_queries
+):
+    with django_assert_num_queries(num_queries):
+        response = user_client.get(f'/posts/{post.id}/{action}/')
+    assert response.status_code == 200
+
+
+def test_foreign_post_edit_redirects_after_one_lookup(
+        another_user_client, post, django_assert_num_queries
+):
+    with django_assert_num_queries(3):
+        response = another_user_client.get(f'/posts/{post.id}/edit/')
+    assert response.status_code == 302
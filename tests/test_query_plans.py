@@ -0,0 +1,25 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.management.commands.check_feed_plans import FULL_SCAN_PATTERNS
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_feed_queries_use_indexes():
+    call_command('check_feed_plans', stdout=StringIO())
+
+
+@pytest.mark.parametrize(
+    ('line', 'expected'),
+    [
+        ('2 0 0 SCAN blog_post', ['blog_post']),
+        ('2 0 0 SCAN TABLE blog_post', ['blog_post']),
+        ('2 0 0 SCAN blog_post USING INDEX post_visible_pub_date_idx', []),
+        ('5 0 0 SEARCH blog_post USING INDEX post_author_pub_date_idx', []),
+    ],
+)
+def test_sqlite_full_scan_detection(line, expected):
+    assert FULL_SCAN_PATTERNS['sqlite'].findall(line) == expected
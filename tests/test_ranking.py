@@ -0,0 +1,93 @@
+import math
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.models import Comments, PostRanking
+from blog.ranking import add_scores, popular_post_list, rank_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def make_post(make_visible_post):
+    def make_post(days_ago, **kwargs):
+        return make_visible_post(
+            pub_date=timezone.now() - timedelta(days=days_ago), **kwargs
+        )
+    return make_post
+
+
+def score(post):
+    return PostRanking.objects.get(post=post).score
+
+
+def test_add_scores_is_log_of_sum():
+    assert add_scores(None, 3.0) == 3.0
+    assert add_scores(10.0, 10.0) == pytest.approx(11.0)
+    assert add_scores(2000.0, 1.0) == pytest.approx(2000.0)
+    assert add_scores(3.0, 5.0) == pytest.approx(math.log2(2 ** 3 + 2 ** 5))
+
+
+def test_comments_outrank_newer_quiet_posts(make_post, mixer, user):
+    discussed = make_post(days_ago=2)
+    fresh = make_post(days_ago=0)
+    assert list(popular_post_list()) == [fresh, discussed]
+
+    mixer.cycle(3).blend('blog.Comments', post=discussed, author=user)
+    assert list(popular_post_list()) == [discussed, fresh]
+
+
+def test_incremental_score_matches_recount(make_post, mixer, user):
+    post = make_post(days_ago=1)
+    comments = mixer.cycle(4).blend('blog.Comments', post=post, author=user)
+    incremental = score(post)
+    rank_posts([post.pk])
+    assert score(post) == pytest.approx(incremental)
+
+    comments[0].delete()
+    after_delete = score(post)
+    rank_posts([post.pk])
+    assert after_delete == pytest.approx(score(post))
+    assert after_delete < incremental
+
+
+def test_feed_skips_hidden_and_decayed_posts(make_post):
+    visible = make_post(days_ago=1)
+    make_post(days_ago=1, is_published=False)
+    make_post(days_ago=100)
+    assert list(popular_post_list()) == [visible]
+
+
+def test_update_command_only_touches_stale_posts(make_post, user):
+    posts = [make_post(days_ago=1) for _ in range(3)]
+    # bulk_create обходит сигналы: счёт поста устаревает.
+    Comments.objects.bulk_create(
+        Comments(post=posts[0], author=user, text='-') for _ in range(2)
+    )
+    PostRanking.objects.filter(post=posts[1]).delete()
+    before = score(posts[0])
+
+    output = StringIO()
+    call_command('update_post_ranking', stdout=output)
+    assert 'Пересчитано постов: 2.' in output.getvalue()
+    assert score(posts[0]) > before
+    assert PostRanking.objects.filter(post=posts[1]).exists()
+
+    output = StringIO()
+    call_command('update_post_ranking', stdout=output)
+    assert 'Пересчитано постов: 0.' in output.getvalue()
+
+
+def test_popular_page(client, user_client, make_post):
+    quiet = make_post(days_ago=1)
+    discussed = make_post(days_ago=1)
+    response = client.get('/popular/')
+    assert response.status_code == 200
+
+    user_client.post(f'/posts/{discussed.pk}/comment/', {'text': 'Ого'})
+    content = client.get('/popular/').content.decode()
+    assert content.index(discussed.title) < content.index(quiet.title)
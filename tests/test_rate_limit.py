@@ -0,0 +1,115 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.ratelimit import client_ip, get_backend, parse_rate, take_token
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def comment_url(visible_post):
+    return f'/posts/{visible_post.pk}/comment/'
+
+
+@pytest.fixture(autouse=True)
+def clear_memory_buckets(settings):
+    yield
+    settings.BLOG_RATE_LIMIT_BACKEND = 'memory'
+    get_backend().clear()
+
+
+@pytest.fixture(params=['cache', 'memory'])
+def backend(request, settings):
+    settings.BLOG_RATE_LIMIT_BACKEND = request.param
+    return request.param
+
+
+def test_parse_rate():
+    assert parse_rate('10/m') == (10 / 60, 10)
+    assert parse_rate('2/s') == (2, 2)
+    with pytest.raises(ValueError):
+        parse_rate('10/week')
+
+
+def test_bucket_refills_over_time():
+    rate, capacity = parse_rate('2/s')
+    state = None
+    for _ in range(2):
+        state, wait = take_token(state, 100.0, rate, capacity)
+        assert wait == 0
+    state, wait = take_token(state, 100.0, rate, capacity)
+    assert wait == pytest.approx(0.5)
+    _, wait = take_token(state, 100.5, rate, capacity)
+    assert wait == 0
+
+
+def test_comment_burst_gets_429(settings, backend, user_client, comment_url):
+    settings.BLOG_RATE_LIMITS = {'comment': '2/m'}
+    for _ in range(2):
+        assert user_client.post(comment_url, {'text': 'Ок'}).status_code == 302
+    response = user_client.post(comment_url, {'text': 'Ещё'})
+    assert response.status_code == 429
+    assert 1 <= int(response['Retry-After']) <= 30
+
+
+def test_user_and_ip_buckets_are_separate(
+    settings, user_client, another_user_client, comment_url
+):
+    settings.BLOG_RATE_LIMITS = {'comment': {'user': '1/m', 'ip': '3/m'}}
+    assert user_client.post(comment_url, {'text': '1'}).status_code == 302
+    assert user_client.post(comment_url, {'text': '2'}).status_code == 429
+    # Другой пользователь с того же адреса: своя корзина, общий IP.
+    assert another_user_client.post(
+        comment_url, {'text': '3'}
+    ).status_code == 302
+    assert another_user_client.post(
+        comment_url, {'text': '4'}, REMOTE_ADDR='10.0.0.2'
+    ).status_code == 429
+
+
+def test_forwarded_ip_header_ignores_client_entries(settings, user_client):
+    settings.BLOG_RATE_LIMITS = {'post': {'ip': '1/h'}}
+    settings.BLOG_RATE_LIMIT_IP_HEADER = 'HTTP_X_FORWARDED_FOR'
+
+    def create(forwarded_for):
+        return user_client.post(
+            '/posts/create/', {}, HTTP_X_FORWARDED_FOR=forwarded_for
+        ).status_code
+
+    assert create('10.0.0.1') == 200
+    # Левые записи подставляет клиент: новая корзина ему не достаётся.
+    assert create('1.2.3.4, 10.0.0.1') == 429
+    assert create('5.6.7.8, 10.0.0.1') == 429
+    assert create('10.0.0.2') == 200
+
+
+def test_proxy_hops(settings, rf):
+    settings.BLOG_RATE_LIMIT_IP_HEADER = 'HTTP_X_FORWARDED_FOR'
+    settings.BLOG_RATE_LIMIT_PROXY_HOPS = 2
+    request = rf.get(
+        '/', HTTP_X_FORWARDED_FOR='1.2.3.4, 10.0.0.1, 172.16.0.1',
+        REMOTE_ADDR='172.16.0.2'
+    )
+    assert client_ip(request) == '10.0.0.1'
+    # Меньше записей, чем прокси: заголовку не верим.
+    request = rf.get(
+        '/', HTTP_X_FORWARDED_FOR='10.0.0.1', REMOTE_ADDR='172.16.0.2'
+    )
+    assert client_ip(request) == '172.16.0.2'
+
+
+def test_form_page_does_not_take_tokens(settings, user_client):
+    settings.BLOG_RATE_LIMITS = {'post': '1/h'}
+    for _ in range(3):
+        assert user_client.get('/posts/create/').status_code == 200
+    assert user_client.post('/posts/create/', {}).status_code == 200
+    assert user_client.post('/posts/create/', {}).status_code == 429
+
+
+def test_benchmark_command(comment_url):
+    output = StringIO()
+    call_command('benchmark_rate_limit', repeat=3, keys=2, stdout=output)
+    for name in ('take() memory', 'take() cache', 'POST off', 'POST cache'):
+        assert name in output.getvalue()
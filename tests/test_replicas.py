@@ -0,0 +1,79 @@
+import sqlite3
+
+import pytest
+from django.contrib.sessions.models import Session
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from blog.management.commands.replicate_sqlite import copy_database
+from blog.middleware import ReplicaMiddleware
+from blog.models import Post
+from blog.routers import ReplicaRouter, read_from
+
+router = ReplicaRouter()
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.BLOG_READ_REPLICAS = ['replica']
+
+
+def test_router_reads_from_replica_only_when_enabled(replicas):
+    assert router.db_for_read(Post) is None
+    with read_from('replica'):
+        assert router.db_for_read(Post) == 'replica'
+        assert router.db_for_read(Session) is None
+        assert router.db_for_write(Post) == DEFAULT_DB_ALIAS
+    assert router.db_for_read(Post) is None
+
+
+@pytest.mark.django_db
+def test_transactions_read_from_primary(replicas):
+    with read_from('replica'), transaction.atomic():
+        assert router.db_for_read(Post) is None
+
+
+def route_request(request):
+    routed = []
+    middleware = ReplicaMiddleware(
+        lambda request: routed.append(router.db_for_read(Post))
+        or HttpResponse()
+    )
+    return middleware(request), routed[0]
+
+
+def test_get_reads_from_replica(replicas):
+    _, alias = route_request(RequestFactory().get('/'))
+    assert alias == 'replica'
+
+
+def test_write_pins_visitor_to_primary(replicas, settings):
+    response, alias = route_request(RequestFactory().post('/posts/1/comment/'))
+    assert alias is None
+    pin = response.cookies[ReplicaMiddleware.pin_cookie]
+    assert pin['max-age'] == settings.BLOG_REPLICA_PIN_SECONDS
+
+    factory = RequestFactory()
+    factory.cookies[ReplicaMiddleware.pin_cookie] = pin.value
+    response, alias = route_request(factory.get('/'))
+    assert alias is None
+    assert ReplicaMiddleware.pin_cookie not in response.cookies
+
+
+def test_no_replicas_no_pinning():
+    response, alias = route_request(RequestFactory().post('/'))
+    assert alias is None
+    assert not response.cookies
+
+
+@pytest.mark.django_db(transaction=True)
+def test_copy_database(tmp_path, post_with_published_location):
+    path = tmp_path / 'replica.sqlite3'
+    copy_database(connections[DEFAULT_DB_ALIAS], path)
+    with sqlite3.connect(path) as replica:
+        rows = replica.execute(
+            'SELECT title FROM blog_post WHERE id = ?',
+            [post_with_published_location.pk]
+        ).fetchall()
+    assert rows == [(post_with_published_location.title,)]
@@ -0,0 +1,62 @@
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.models import Post
+from blog.scheduler import (get_next_due, publish_due_posts, reset_next_due,
+                            run_scheduler)
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_visibility_is_materialized_on_save(
+    make_visible_post, published_category
+):
+    past = make_visible_post(pub_date=timezone.now() - timedelta(days=1))
+    future = make_visible_post(pub_date=timezone.now() + timedelta(days=1))
+    assert past.is_visible and not future.is_visible
+    assert get_next_due() == future.pub_date
+
+    published_category.is_published = False
+    published_category.save()
+    assert not Post.objects.filter(is_visible=True).exists()
+
+
+def test_publish_due_posts(client, make_visible_post):
+    post = make_visible_post(pub_date=timezone.now() + timedelta(hours=1))
+    assert publish_due_posts() == 0
+    assert publish_due_posts(now=timezone.now() + timedelta(hours=2)) == 1
+    post.refresh_from_db()
+    assert post.is_visible
+    assert get_next_due() is None
+
+
+def test_due_post_appears_without_worker(user_client, make_visible_post):
+    post = make_visible_post(pub_date=timezone.now() + timedelta(hours=1))
+    assert post.title not in user_client.get('/').content.decode()
+
+    Post.objects.filter(pk=post.pk).update(
+        pub_date=timezone.now() - timedelta(seconds=1)
+    )
+    reset_next_due()
+    assert post.title in user_client.get('/').content.decode()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_run_scheduler_in_thread(make_visible_post):
+    post = make_visible_post(pub_date=timezone.now() + timedelta(seconds=0.3))
+    stop = threading.Event()
+    worker = threading.Thread(
+        target=run_scheduler, kwargs={'stop_event': stop, 'max_interval': 5}
+    )
+    worker.start()
+    try:
+        time.sleep(0.8)
+    finally:
+        stop.set()
+        worker.join()
+    post.refresh_from_db()
+    assert post.is_visible
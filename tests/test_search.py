@@ -0,0 +1,106 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.benchmarking import reload_urlconf
+from blog.search import python_index, search_post_ids
+from blog.stemmer import stem
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(params=['auto', 'python'], autouse=True)
+def backend(request, settings):
+    settings.BLOG_SEARCH_BACKEND = request.param
+    python_index.clear()
+    yield request.param
+    python_index.clear()
+
+
+@pytest.fixture
+def make_post(make_visible_post, published_location):
+    def make(title, text='', **kwargs):
+        return make_visible_post(
+            title=title, text=text, location=published_location, **kwargs
+        )
+    return make
+
+
+@pytest.mark.parametrize(
+    ('word', 'expected'),
+    [('праздники', 'праздник'), ('красивейшая', 'красив'),
+     ('прогулялись', 'прогуля'), ('книгами', 'книг')],
+)
+def test_russian_stemmer(word, expected):
+    assert stem(word) == expected
+
+
+def test_search_uses_stems_and_ranks_title_first(make_post):
+    in_text = make_post('Обычный день', 'Готовимся к праздникам')
+    in_title = make_post('Праздники в городе', 'Рецепт торта')
+    make_post('Прогулка', 'Ничего общего')
+    assert search_post_ids('праздник торт', 10) == [in_title.pk]
+    assert search_post_ids('праздник', 10) == [in_title.pk, in_text.pk]
+
+
+def test_index_follows_edits_and_deletes(make_post):
+    post = make_post('Горы', 'Поход')
+    post.title = 'Море'
+    post.save()
+    assert search_post_ids('горы', 10) == []
+    assert search_post_ids('море', 10) == [post.pk]
+    post_pk = post.pk
+    post.delete()
+    assert post_pk not in search_post_ids('море', 10)
+
+
+def test_category_rename_is_indexed(make_post, published_category):
+    post = make_post('Заметка')
+    published_category.title = 'Путешествия'
+    published_category.save()
+    assert search_post_ids('путешествие', 10) == [post.pk]
+
+
+def test_search_view_applies_feed_visibility(client, make_post):
+    visible = make_post('Выставка картин')
+    make_post('Выставка скульптур', is_published=False)
+    make_post('Выставка фото', pub_date=timezone.now() + timedelta(days=1))
+    response = client.get('/search/', {'q': 'выставки'})
+    assert [post.pk for post in response.context['page_obj']] == [visible.pk]
+
+
+@pytest.fixture
+def debug_toolbar(settings):
+    # Маршруты debug-toolbar подключаются при импорте urls только с DEBUG.
+    settings.DEBUG = True
+    reload_urlconf()
+    yield
+    settings.DEBUG = False
+    reload_urlconf()
+
+
+def test_post_views_with_debug_toolbar(
+        debug_toolbar, user_client, published_category, published_location
+):
+    # Панель SQL debug-toolbar оборачивает курсор и не умеет executemany.
+    form = {
+        'title': 'Горы',
+        'text': 'Поход',
+        'pub_date': (timezone.now() - timedelta(days=1)).strftime(
+            '%Y-%m-%d %H:%M'
+        ),
+        'category': published_category.pk,
+        'location': published_location.pk,
+        'is_published': True,
+    }
+    assert user_client.post('/posts/create/', form).status_code == 302
+    [post_pk] = search_post_ids('горы', 10)
+    response = user_client.post(
+        f'/posts/{post_pk}/edit/', {**form, 'title': 'Море'}
+    )
+    assert response.status_code == 302
+    assert search_post_ids('море', 10) == [post_pk]
+    response = user_client.post(f'/posts/{post_pk}/delete/')
+    assert response.status_code == 302
+    assert search_post_ids('море', 10) == []
@@ -0,0 +1,61 @@
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+MANAGE_PY = Path(__file__).resolve().parent.parent / 'blogicum' / 'manage.py'
+
+
+def manage(database, *args):
+    """manage.py в отдельном процессе на файловой базе database: WAL и
+    PRAGMA не работают на базе тестов в памяти.
+    """
+    subprocess.run(
+        [sys.executable, str(MANAGE_PY), *args],
+        env={**os.environ, 'DATABASE_URL': f'sqlite:///{database}'},
+        cwd=MANAGE_PY.parent,
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = tmp_path / 'concurrency.sqlite3'
+    manage(path, 'migrate', '--verbosity', '0')
+    manage(
+        path, 'generate_data', '--users', '5', '--categories', '2',
+        '--locations', '2', '--posts', '30', '--comments-per-post', '1'
+    )
+    return path
+
+
+def test_comment_writes_and_feed_reads(database, tmp_path):
+    """add_comment и IndexListView из параллельных потоков через WSGI:
+    ошибки обработчиков и исключения потоков load_test_db собирает и
+    возвращает в основной поток.
+    """
+    output = tmp_path / 'load.json'
+    manage(
+        database, 'load_test_db', '--threads', '4', '--requests', '200',
+        '--write-share', '0.5', '--configs', 'wal', 'defaults',
+        '--output', str(output)
+    )
+    configs = json.loads(output.read_text(encoding='utf-8'))['configs']
+    for name, result in configs.items():
+        assert result['errors'] == {}, name
+        assert set(result['statuses']) <= {'200', '302'}, name
+        assert result['writes'] and result['reads'], name
+    assert configs['wal']['lock_errors'] == 0
+
+    with sqlite3.connect(database) as raw:
+        drift = raw.execute(
+            'SELECT count(*) FROM blog_post WHERE comment_count != '
+            '(SELECT count(*) FROM blog_comments '
+            'WHERE blog_comments.post_id = blog_post.id)'
+        ).fetchone()[0]
+    assert drift == 0
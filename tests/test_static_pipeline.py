@@ -0,0 +1,69 @@
+import gzip
+from io import StringIO
+
+import pytest
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import Client
+
+from blog.staticfiles import accepted_encodings
+
+CSS = 'css/bootstrap.min.css'
+
+
+@pytest.fixture
+def collected(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path / 'static'
+    settings.STATICFILES_STORAGE = (
+        'blog.staticfiles.CompressedManifestStaticFilesStorage'
+    )
+    settings.BLOG_STATIC_SERVE = True
+    call_command('collectstatic', interactive=False, stdout=StringIO())
+    return settings.STATIC_ROOT
+
+
+def test_collectstatic_hashes_and_compresses(collected):
+    hashed = staticfiles_storage.stored_name(CSS)
+    assert hashed != CSS
+    path = collected / hashed
+    compressed = path.with_name(path.name + '.gz')
+    assert gzip.decompress(compressed.read_bytes()) == path.read_bytes()
+    # PNG уже сжат — копии не нужны.
+    assert not list(collected.rglob('*.png.gz'))
+
+
+def test_hashed_files_are_served_compressed_and_immutable(collected):
+    url = staticfiles_storage.url(CSS)
+    path = collected / staticfiles_storage.stored_name(CSS)
+    response = Client().get(url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+    assert response.status_code == 200
+    assert response['Content-Encoding'] == 'gzip'
+    assert response['Content-Type'].startswith('text/css')
+    assert 'immutable' in response['Cache-Control']
+    assert response['Vary'] == 'Accept-Encoding'
+    body = gzip.decompress(b''.join(response.streaming_content))
+    assert body == path.read_bytes()
+
+
+def test_identity_without_accept_encoding(collected):
+    response = Client().get(
+        staticfiles_storage.url(CSS), HTTP_ACCEPT_ENCODING='gzip;q=0'
+    )
+    assert not response.has_header('Content-Encoding')
+    # Исходное имя без хеша не кешируется надолго.
+    response = Client().get(f'/static/{CSS}')
+    assert response['Cache-Control'] == 'public, max-age=60'
+
+
+@pytest.mark.django_db
+def test_pages_link_hashed_names(collected, client):
+    content = client.get('/pages/about/').content.decode()
+    assert staticfiles_storage.url('img/logo.png') in content
+    assert '/static/img/logo.png' not in content
+
+
+def test_accepted_encodings():
+    assert accepted_encodings('br;q=0.5, gzip, identity;q=0') == {
+        'br', 'gzip'
+    }
+    assert accepted_encodings('') == {''}
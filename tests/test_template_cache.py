@@ -0,0 +1,55 @@
+import json
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.template import engines
+from django.template.loaders.filesystem import Loader
+
+from blog.templating import (iter_template_names, template_settings,
+                             warm_template_cache)
+
+
+def test_warmup_compiles_every_template(settings):
+    settings.TEMPLATES = template_settings(cached=True)
+    names = list(iter_template_names(settings.TEMPLATES_DIR))
+    assert 'base.html' in names and 'includes/post_card.html' in names
+    assert warm_template_cache() == len(names)
+
+    # После прогрева шаблоны не читаются с диска.
+    with mock.patch.object(Loader, 'get_contents') as get_contents:
+        for name in names:
+            engines['django'].get_template(name)
+    get_contents.assert_not_called()
+
+
+def test_template_settings_keep_options():
+    for cached in (False, True):
+        template, = template_settings(cached)
+        original, = settings.TEMPLATES
+        assert template['DIRS'] == original['DIRS']
+        assert (
+            template['OPTIONS']['context_processors']
+            == original['OPTIONS']['context_processors']
+        )
+        loader = template['OPTIONS']['loaders'][0]
+        assert isinstance(loader, tuple) is cached
+
+
+@pytest.mark.django_db
+def test_benchmark_compares_loaders(tmp_path):
+    call_command(
+        'generate_data', users=3, categories=2, locations=2, posts=10,
+        future_share=0, unpublished_share=0, stdout=StringIO()
+    )
+    output = tmp_path / 'templates.json'
+    call_command(
+        'benchmark_templates', repeat=1, output=str(output), stdout=StringIO()
+    )
+    report = json.loads(output.read_text())
+    assert report['pages']['blog:index']['template'] == 'blog/index.html'
+    assert report['modes']['cached']['templates'] > 0
+    for mode in ('uncached', 'cached'):
+        assert report['modes'][mode]['pages']['blog:index']['p50_ms'] > 0